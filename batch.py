@@ -0,0 +1,132 @@
+"""Multi-process batch hashing of many files or messages.
+
+The pure-Python compression loop is CPU bound and holds the GIL, so
+batches are split into chunks and fanned out over a process pool. At
+most a few chunks per worker are in flight, so arbitrarily long input
+iterables never get materialized at once.
+
+With a prefix cache every worker remembers H0-H7 after each block it
+compresses, so items sharing long prefixes (templated records, versions
+of one file) only compress the blocks after the shared part.
+"""
+import collections
+import os
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from itertools import islice
+
+from hashing import ALGORITHMS, PrefixCache, hash_file, read_file
+
+DEFAULT_CHUNKSIZE = 16
+CHUNKS_IN_FLIGHT_PER_WORKER = 2
+
+# The worker's prefix cache, kept between chunks; None until first used
+_prefix_cache = None
+
+def _worker_prefix_cache(max_bytes):
+    global _prefix_cache
+    if _prefix_cache is None or _prefix_cache.entries.max_bytes != max_bytes:
+        _prefix_cache = PrefixCache(max_bytes)
+    return _prefix_cache
+
+def _hash_item(kind, algorithm, item, prefix_cache=None):
+    if kind == "file":
+        if prefix_cache is None or item == "-":
+            return hash_file(algorithm, item)
+        return prefix_cache.hexdigest(algorithm, read_file(item))
+    if isinstance(item, str):
+        item = item.encode("utf-8")
+    if prefix_cache is not None:
+        return prefix_cache.hexdigest(algorithm, item)
+    return algorithm.new(item).hexdigest()
+
+def _hash_chunk(kind, algo, items, prefix_cache_bytes=0):
+    """Worker entry point: hash one chunk, returning (item, digest, error) tuples"""
+    algorithm = ALGORITHMS[algo]
+    prefix_cache = _worker_prefix_cache(prefix_cache_bytes) if prefix_cache_bytes else None
+    results = []
+    for item in items:
+        try:
+            results.append((item, _hash_item(kind, algorithm, item, prefix_cache), None))
+        except OSError as e:
+            results.append((item, None, e.strerror))
+    return results
+
+def _chunked(items, chunksize):
+    items = iter(items)
+    while True:
+        chunk = list(islice(items, chunksize))
+        if not chunk:
+            return
+        yield chunk
+
+def _check_chunksize(chunksize):
+    # Checked before the generator starts, so callers see it at the call
+    if chunksize < 1:
+        raise ValueError("chunksize must be at least 1")
+
+def _run(kind, items, algo, workers, chunksize, ordered, prefix_cache_bytes):
+    if algo not in ALGORITHMS:
+        raise ValueError(f"unknown algorithm: {algo}")
+    if workers is None:
+        workers = os.cpu_count() or 1
+    chunks = _chunked(items, chunksize)
+    
+    # Not worth spawning processes for a single worker
+    if workers <= 1:
+        for chunk in chunks:
+            yield from _hash_chunk(kind, algo, chunk, prefix_cache_bytes)
+        return
+        
+    max_in_flight = workers * CHUNKS_IN_FLIGHT_PER_WORKER
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        def submit_next():
+            chunk = next(chunks, None)
+            if chunk is None:
+                return None
+            return executor.submit(_hash_chunk, kind, algo, chunk, prefix_cache_bytes)
+            
+        if ordered:
+            pending = collections.deque()
+            while True:
+                while len(pending) < max_in_flight:
+                    future = submit_next()
+                    if future is None:
+                        break
+                    pending.append(future)
+                if not pending:
+                    return
+                yield from pending.popleft().result()
+        else:
+            pending = set()
+            while True:
+                while len(pending) < max_in_flight:
+                    future = submit_next()
+                    if future is None:
+                        break
+                    pending.add(future)
+                if not pending:
+                    return
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield from future.result()
+
+def hash_files(paths, algo="sha256", workers=None, chunksize=DEFAULT_CHUNKSIZE, ordered=True,
+                prefix_cache_bytes=0):
+    """Hash many files across worker processes.
+    
+    Yields (path, hexdigest, error) tuples; error is the OS error message
+    for unreadable files and hexdigest is None in that case. With
+    ordered=False results are yielded as soon as their chunk completes.
+    prefix_cache_bytes > 0 gives every worker a PrefixCache of that size.
+    """
+    _check_chunksize(chunksize)
+    return _run("file", paths, algo, workers, chunksize, ordered, prefix_cache_bytes)
+
+def hash_messages(messages, algo="sha256", workers=None, chunksize=DEFAULT_CHUNKSIZE, ordered=True,
+                  prefix_cache_bytes=0):
+    """Hash many in-memory messages (bytes, or str encoded as UTF-8) across worker processes.
+    
+    Yields (message, hexdigest, None) tuples in the same way as hash_files().
+    """
+    _check_chunksize(chunksize)
+    return _run("message", messages, algo, workers, chunksize, ordered, prefix_cache_bytes)
@@ -0,0 +1,303 @@
+"""Benchmarks for the SHA visualizer.
+
+Run ``python bench.py`` to check that the engine modules still import
+quickly and without pulling in pygame. ``python main.py bench`` measures
+the hash engines and the renderer; see run_benchmarks().
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Modules that must stay cheap to import, with their cold-start budget in ms
+IMPORT_BUDGETS_MS = {
+    "hashing": 50.0,
+    "cli": 50.0,
+    "main": 50.0,
+}
+
+IMPORT_PROBE = """
+import sys, time
+start = time.perf_counter()
+import {module}
+elapsed = (time.perf_counter() - start) * 1000
+print(elapsed, "pygame" in sys.modules)
+"""
+
+def measure_import_time(module, runs=5):
+    """Return (best cold import time in ms, whether pygame got imported)"""
+    best = None
+    loaded_pygame = False
+    for _ in range(runs):
+        # A fresh interpreter per run so nothing is cached in sys.modules
+        output = subprocess.run(
+            [sys.executable, "-c", IMPORT_PROBE.format(module=module)],
+            cwd=REPO_DIR, capture_output=True, text=True, check=True
+        ).stdout.split()
+        elapsed = float(output[0])
+        loaded_pygame = loaded_pygame or output[1] == "True"
+        best = elapsed if best is None else min(best, elapsed)
+    return best, loaded_pygame
+
+def check_import_times(runs=5, scale=1.0):
+    """Print import times and return True if every module is within budget"""
+    ok = True
+    for module, budget in IMPORT_BUDGETS_MS.items():
+        elapsed, loaded_pygame = measure_import_time(module, runs)
+        budget *= scale
+        status = "ok"
+        if loaded_pygame:
+            status = "FAIL (imports pygame)"
+            ok = False
+        elif elapsed > budget:
+            status = f"FAIL (budget {budget:.1f} ms)"
+            ok = False
+        print(f"import {module:<10} {elapsed:8.2f} ms  {status}")
+    return ok
+
+# Engine and renderer benchmarks
+DEFAULT_ALGORITHMS = ("sha256", "sha512")  # The truncated variants share their compression
+DEFAULT_SIZES = (0, 64, 1 << 10, 64 << 10, 1 << 20)
+SIZE_SUFFIXES = {"K": 1 << 10, "M": 1 << 20, "G": 1 << 30}
+SCENES = ("intro", "preprocessing", "parsing", "initialize", "prepare_schedule", "compression", "final")
+FRAME_MESSAGE = "The quick brown fox jumps over the lazy dog" * 4
+PBKDF2_ITERATIONS = 1000
+
+def parse_size(text):
+    """Parse a byte count such as 64, 1K or 100M"""
+    text = text.strip().upper().rstrip("B")
+    if text and text[-1] in SIZE_SUFFIXES:
+        size = int(float(text[:-1]) * SIZE_SUFFIXES[text[-1]])
+    else:
+        size = int(text)
+    if size < 0:
+        raise ValueError(f"{text} is below 0 bytes")
+    return size
+
+def format_size(size):
+    for suffix in ("G", "M", "K"):
+        if size >= SIZE_SUFFIXES[suffix] and size % SIZE_SUFFIXES[suffix] == 0:
+            return f"{size // SIZE_SUFFIXES[suffix]}{suffix}"
+    return f"{size}B"
+
+def time_call(func, min_time):
+    """Best seconds per call of func, repeating it for at least min_time"""
+    best = None
+    total = 0.0
+    while best is None or total < min_time:
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        total += elapsed
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def message_of_size(size):
+    pattern = bytes(range(256))
+    return (pattern * (size // len(pattern) + 1))[:size]
+
+def bench_throughput(algorithm, sizes, min_time):
+    """Hash messages of each size with the streaming engine"""
+    results = []
+    algorithm.new(b"abc").digest()  # Generate the unrolled compress outside the timing
+    for size in sizes:
+        data = message_of_size(size)
+        seconds = time_call(lambda: algorithm.new(data).hexdigest(), min_time)
+        results.append({
+            "algorithm": algorithm.name,
+            "size": size,
+            "seconds": seconds,
+            "mb_per_s": size / seconds / 1e6,
+            "hashes_per_s": 1 / seconds,
+        })
+    return results
+
+def bench_blocks(algorithm, min_time, calls=200):
+    """Time the unrolled compress, the readable compress_block and prepare_message_schedule on one block"""
+    block = algorithm.split_blocks(algorithm.pad_message(b"abc"))[0]
+    hash_values = list(algorithm.init_values)
+    algorithm.compress(block, hash_values)  # Generate the unrolled function outside the timing
+    
+    def unrolled():
+        for _ in range(calls):
+            algorithm.compress(block, hash_values)
+            
+    def compress():
+        for _ in range(calls):
+            algorithm.compress_block(block, hash_values)
+            
+    def schedule():
+        for _ in range(calls):
+            algorithm.prepare_message_schedule(block)
+            
+    unrolled_seconds = time_call(unrolled, min_time) / calls
+    compress_seconds = time_call(compress, min_time) / calls
+    schedule_seconds = time_call(schedule, min_time) / calls
+    return {
+        "algorithm": algorithm.name,
+        "blocks_per_s": 1 / unrolled_seconds,
+        "block_us": unrolled_seconds * 1e6,
+        "readable_block_us": compress_seconds * 1e6,
+        "round_ns": (compress_seconds - schedule_seconds) / algorithm.rounds * 1e9,
+        "schedule_us": schedule_seconds * 1e6,
+    }
+
+def bench_pbkdf2(algorithm, min_time, iterations=PBKDF2_ITERATIONS):
+    """PBKDF2-HMAC iterations per second, and one-block MACs with cached and freshly compressed pads"""
+    from keyed import HMACKey, hmac_key, pbkdf2_hmac
+    message = message_of_size(64)
+    key = b"benchmark key"
+    hmac_key(algorithm, key)  # Compress the pads outside the timing
+    
+    derive_seconds = time_call(lambda: pbkdf2_hmac(algorithm, b"password", b"salt", iterations), min_time)
+    cached_seconds = time_call(lambda: hmac_key(algorithm, key).new(message).digest(), min_time)
+    fresh_seconds = time_call(lambda: HMACKey(algorithm, key).new(message).digest(), min_time)
+    return {
+        "algorithm": algorithm.name,
+        "iterations": iterations,
+        "iterations_per_s": iterations / derive_seconds,
+        "derive_ms": derive_seconds * 1000,
+        "hmac_us": cached_seconds * 1e6,
+        "uncached_hmac_us": fresh_seconds * 1e6,
+    }
+
+def import_gui():
+    """The visualizer module, set up for a headless display"""
+    # The dummy driver needs no display; it has to be chosen before pygame starts
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+    import gui
+    return gui
+
+def bench_frames(algorithm_name, frames):
+    """Time full and idle Visualization.draw frames per scene on a headless display"""
+    gui = import_gui()
+    
+    # The visualizer prints progress notes that must not mix with JSON on stdout
+    with contextlib.redirect_stdout(sys.stderr):
+        screen = gui.init_pygame()
+        visualization = gui.Visualization()
+        radio = next(button for button in visualization.radio_group.buttons if button.text == algorithm_name)
+        radio.selected = True
+        visualization.radio_group.deselect_others(radio)
+        radio.callback()
+        visualization.text_box.text = FRAME_MESSAGE
+        visualization.start_hash()
+        
+        results = []
+        for scene in SCENES:
+            visualization.current_scene = scene
+            visualization.step_index = 0
+            visualization.draw(screen)  # Warm the text cache
+            
+            full = []
+            for _ in range(frames):
+                visualization.invalidate()
+                start = time.perf_counter()
+                visualization.draw(screen)
+                full.append(time.perf_counter() - start)
+                
+            idle = []
+            for _ in range(frames):
+                start = time.perf_counter()
+                visualization.draw(screen)
+                idle.append(time.perf_counter() - start)
+                
+            results.append({
+                "algorithm": algorithm_name,
+                "scene": scene,
+                "full_frame_ms": sum(full) / len(full) * 1000,
+                "full_frame_best_ms": min(full) * 1000,
+                "idle_frame_ms": sum(idle) / len(idle) * 1000,
+            })
+    return results
+
+def run_benchmarks(algorithms, sizes=DEFAULT_SIZES, min_time=0.2, frames=30, render=True,
+                   pbkdf2_iterations=PBKDF2_ITERATIONS, profiler=None):
+    """Run every benchmark and return the results as a JSON-serializable dict.
+    
+    With a profiling.Profiler the engine (and the visualizer, if render)
+    records spans while the benchmarks run; the timings then include the
+    cost of recording them.
+    """
+    if profiler is not None:
+        from profiling import instrument_engine
+        instrument_engine(profiler)
+        if render:
+            import_gui().instrument(profiler)
+    try:
+        return _run_benchmarks(algorithms, sizes, min_time, frames, render, pbkdf2_iterations)
+    finally:
+        if profiler is not None:
+            profiler.restore()
+
+def _run_benchmarks(algorithms, sizes, min_time, frames, render, pbkdf2_iterations):
+    report = {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "throughput": [],
+        "blocks": [],
+        "pbkdf2": [],
+        "frames": [],
+    }
+    for algorithm in algorithms:
+        report["throughput"] += bench_throughput(algorithm, sizes, min_time)
+        report["blocks"].append(bench_blocks(algorithm, min_time))
+        report["pbkdf2"].append(bench_pbkdf2(algorithm, min_time, pbkdf2_iterations))
+        if render:
+            report["frames"] += bench_frames(algorithm.name, frames)
+    return report
+
+def print_report(report, file=sys.stdout):
+    print(f"{report['implementation']} {report['python']} on {report['platform']}", file=file)
+    
+    print("\nThroughput (streaming engine)", file=file)
+    for row in report["throughput"]:
+        print(f"  {row['algorithm']:<11} {format_size(row['size']):>6}  {row['seconds'] * 1000:10.3f} ms"
+              f"  {row['mb_per_s']:8.3f} MB/s  {row['hashes_per_s']:10.1f} hashes/s", file=file)
+              
+    print("\nBlocks", file=file)
+    for row in report["blocks"]:
+        print(f"  {row['algorithm']:<11} {row['blocks_per_s']:10.1f} blocks/s  {row['block_us']:8.2f} us/block"
+              f"  (readable {row['readable_block_us']:.2f})  {row['round_ns']:8.1f} ns/round"
+              f"  {row['schedule_us']:8.2f} us/schedule", file=file)
+              
+    print("\nPBKDF2-HMAC", file=file)
+    for row in report["pbkdf2"]:
+        print(f"  {row['algorithm']:<11} {row['iterations_per_s']:10.1f} iterations/s  {row['derive_ms']:8.2f} ms"
+              f" for {row['iterations']}  {row['hmac_us']:8.2f} us/HMAC  (pads not cached {row['uncached_hmac_us']:.2f})",
+              file=file)
+              
+    if report["frames"]:
+        print("\nFrames (headless)", file=file)
+        for row in report["frames"]:
+            print(f"  {row['algorithm']:<11} {row['scene']:<17} {row['full_frame_ms']:8.3f} ms full"
+                  f"  (best {row['full_frame_best_ms']:.3f})  {row['idle_frame_ms']:8.3f} ms idle", file=file)
+
+def write_json(report, path):
+    """Write the report as JSON to path, or stdout for '-'"""
+    if path == "-":
+        json.dump(report, sys.stdout, indent=2)
+        print()
+        return
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+        f.write("\n")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Guard the cold import time of the hash engine.")
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters per module (default: 5)")
+    parser.add_argument("--budget-scale", type=float, default=1.0,
+                        help="multiply every budget, e.g. 2 on slow CI machines")
+    args = parser.parse_args(argv)
+    return 0 if check_import_times(args.runs, args.budget_scale) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
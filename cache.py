@@ -0,0 +1,75 @@
+"""Bounded LRU caches shared by the engine and the visualizer."""
+from collections import OrderedDict
+
+class LRUCache:
+    """Least-recently-used mapping bounded by entry count and estimated size.
+    
+    Every entry is stored with a size in bytes (from sizeof(value) or given
+    explicitly to put()). Old entries are evicted once either max_entries
+    or max_bytes is exceeded; a single entry larger than max_bytes is not
+    cached at all.
+    """
+    def __init__(self, max_bytes=None, max_entries=None, sizeof=None):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.sizeof = sizeof
+        self.entries = OrderedDict()  # key -> (value, size)
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        
+    def __len__(self):
+        return len(self.entries)
+        
+    def __contains__(self, key):
+        return key in self.entries
+        
+    def get(self, key, default=None):
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return entry[0]
+        
+    def put(self, key, value, size=None):
+        if size is None:
+            size = self.sizeof(value) if self.sizeof else 0
+        self.pop(key)
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+            
+        self.entries[key] = (value, size)
+        self.current_bytes += size
+        
+        # Evict least recently used entries until both limits hold
+        while ((self.max_entries is not None and len(self.entries) > self.max_entries) or
+               (self.max_bytes is not None and self.current_bytes > self.max_bytes)):
+            _, (_, evicted_size) = self.entries.popitem(last=False)
+            self.current_bytes -= evicted_size
+            
+    def pop(self, key, default=None):
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return default
+        self.current_bytes -= entry[1]
+        return entry[0]
+        
+    def clear(self):
+        self.entries.clear()
+        self.current_bytes = 0
+        
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+def blake2b(data=b'', digest_size=16):
+    """A hashlib.blake2b hasher, for cache keys and file names"""
+    # hashlib loads OpenSSL, so keep it out of the engine's import path
+    import hashlib
+    return hashlib.blake2b(data, digest_size=digest_size)
+
+def message_key(algorithm, data):
+    """Cache key for a message: the algorithm name plus a digest of the bytes"""
+    return (algorithm.name, len(data), blake2b(data).digest())
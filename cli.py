@@ -0,0 +1,278 @@
+"""Headless command line mode."""
+import argparse
+import itertools
+import os
+import sys
+
+from cache import blake2b
+from hashing import ALGORITHMS, RESUME_BLOCKS, hash_file, hash_file_resumable
+
+def checkpoint_path(directory, algo, path):
+    """Checkpoint file for one input, named after its absolute path"""
+    name = blake2b(os.path.abspath(path).encode("utf-8"), digest_size=12).hexdigest()
+    return os.path.join(directory, f"{algo}-{name}.checkpoint")
+
+def cli_tree_hash(args):
+    from bench import parse_size
+    from tree import format_tree_digest, tree_hash_bytes, tree_hash_file
+    
+    algorithm = ALGORITHMS[args.algo]
+    try:
+        leaf_size = parse_size(args.leaf_size)
+        if leaf_size < 1:
+            raise ValueError("must be at least 1 byte")
+    except ValueError as e:
+        print(f"{args.prog}: invalid leaf size: {e}", file=sys.stderr)
+        return 2
+    status = 0
+    for path in args.files:
+        try:
+            if path == "-":
+                levels = tree_hash_bytes(algorithm, sys.stdin.buffer.read(), leaf_size)
+            else:
+                levels = tree_hash_file(algorithm, path, leaf_size, workers=args.workers)
+        except OSError as e:
+            print(f"{args.prog}: {path}: {e.strerror or e}", file=sys.stderr)
+            status = 1
+            continue
+        print(f"{format_tree_digest(algorithm, leaf_size, levels[-1][0])}  {path}")
+    return status
+
+def cli_hash(args):
+    if args.tree:
+        if args.checkpoint_dir:
+            print(f"{args.prog}: --tree cannot be combined with --checkpoint-dir", file=sys.stderr)
+            return 2
+        return cli_tree_hash(args)
+    algorithm = ALGORITHMS[args.algo]
+    if args.checkpoint_every < 1:
+        print(f"{args.prog}: --checkpoint-every must be at least 1", file=sys.stderr)
+        return 2
+    if args.checkpoint_dir:
+        os.makedirs(args.checkpoint_dir, exist_ok=True)
+    status = 0
+    for path in args.files:
+        try:
+            # Standard input cannot be skipped ahead, so it is never checkpointed
+            if args.checkpoint_dir and path != "-":
+                digest = hash_file_resumable(algorithm, path, checkpoint_path(args.checkpoint_dir, args.algo, path),
+                                             args.checkpoint_every)
+            else:
+                digest = hash_file(algorithm, path)
+        except OSError as e:
+            print(f"{args.prog}: {path}: {e.strerror or e}", file=sys.stderr)
+            status = 1
+            continue
+        # Same layout as sha256sum/sha512sum
+        print(f"{digest}  {path}")
+    return status
+
+def read_lines(path):
+    """Yield the lines of a file (or stdin for '-') without line endings"""
+    stream = sys.stdin if path == "-" else open(path, encoding="utf-8")
+    try:
+        for line in stream:
+            yield line.rstrip("\r\n")
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+def cli_batch(args):
+    # Imported here so the other subcommands don't pay for multiprocessing
+    from batch import hash_files, hash_messages
+    
+    if args.chunksize < 1:
+        print(f"{args.prog}: --chunksize must be at least 1", file=sys.stderr)
+        return 2
+    if args.prefix_cache < 0:
+        print(f"{args.prog}: --prefix-cache must be at least 0", file=sys.stderr)
+        return 2
+    items = list(args.items)
+    if args.items_from:
+        items = itertools.chain(items, read_lines(args.items_from))
+        
+    if args.vectorized:
+        if not args.messages:
+            print(f"{args.prog}: --vectorized only applies to --messages", file=sys.stderr)
+            return 2
+        from vectorized import hash_messages as hash_vectorized
+        try:
+            items = list(items)
+            results = zip(items, hash_vectorized(items, args.algo), itertools.repeat(None))
+        except RuntimeError as e:
+            print(f"{args.prog}: {e}", file=sys.stderr)
+            return 1
+    else:
+        run = hash_messages if args.messages else hash_files
+        results = run(items, args.algo, workers=args.workers, chunksize=args.chunksize,
+                      ordered=not args.unordered, prefix_cache_bytes=args.prefix_cache << 20)
+                      
+    status = 0
+    for item, digest, error in results:
+        if error is not None:
+            print(f"{args.prog}: {item}: {error}", file=sys.stderr)
+            status = 1
+            continue
+        print(f"{digest}  {item}")
+    return status
+
+def cli_bench(args):
+    # The benchmarks import gui (and so pygame) for the frame timings
+    from bench import DEFAULT_ALGORITHMS, DEFAULT_SIZES, parse_size, print_report, run_benchmarks, write_json
+    
+    try:
+        sizes = [parse_size(size) for size in args.sizes] if args.sizes else DEFAULT_SIZES
+    except ValueError as e:
+        print(f"{args.prog}: invalid size: {e}", file=sys.stderr)
+        return 2
+    algorithms = [ALGORITHMS[name] for name in (args.algo or DEFAULT_ALGORITHMS)]
+    
+    if args.pbkdf2_iterations < 1:
+        print(f"{args.prog}: --pbkdf2-iterations must be at least 1", file=sys.stderr)
+        return 2
+    profiler = None
+    if args.trace:
+        from profiling import Profiler
+        profiler = Profiler()
+    report = run_benchmarks(algorithms, sizes, min_time=args.min_time, frames=args.frames,
+                            render=not args.no_render, pbkdf2_iterations=args.pbkdf2_iterations,
+                            profiler=profiler)
+    # Keep stdout clean when it carries the JSON
+    print_report(report, file=sys.stderr if args.json == "-" else sys.stdout)
+    if args.json:
+        write_json(report, args.json)
+    if profiler is not None:
+        from profiling import print_summary
+        profiler.save_chrome_trace(args.trace)
+        print_summary(profiler)
+    return 0
+
+def cli_gui(args):
+    # pygame is only imported once the visualizer is asked for
+    import gui
+    return gui.main(args.profile, args.hud)
+
+def cli_verify(args):
+    from verify import load_shavs, run_verification
+    
+    shavs = []
+    for path in args.vectors or ():
+        try:
+            shavs += load_shavs(path)
+        except (OSError, ValueError) as e:
+            print(f"{args.prog}: {path}: {getattr(e, 'strerror', None) or e}", file=sys.stderr)
+            return 2
+            
+    algos = args.algo or sorted(ALGORITHMS)
+    stats, failures, elapsed = run_verification(algos, args.cases, args.max_blocks, args.seed,
+                                                long=args.long, shavs=shavs, workers=args.workers)
+                                                
+    failed_paths = {(algo, path) for algo, path, _, _, _ in failures}
+    total_cases = total_bytes = 0
+    for (algo, path), (cases, size, seconds) in sorted(stats.items()):
+        rate = size / seconds / 1e6 if seconds else 0.0
+        status = "FAIL" if (algo, path) in failed_paths else "ok"
+        print(f"{algo:<10} {path:<20} {cases:6d} cases  {rate:8.3f} MB/s  {status}")
+        total_cases += cases
+        total_bytes += size
+        
+    for algo, path, case, got, expected in failures:
+        print(f"{args.prog}: {algo} {path}: {case}: got {got}, expected {expected}", file=sys.stderr)
+    print(f"{total_cases} checks, {total_bytes / 1e6:.2f} MB in {elapsed:.2f} s "
+          f"({total_bytes / elapsed / 1e6:.3f} MB/s), {len(failures)} failures")
+    return 1 if failures else 0
+
+def run_cli(argv):
+    parser = argparse.ArgumentParser(prog=os.path.basename(sys.argv[0]),
+                                     description="Hash files without opening the visualizer.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    
+    hash_parser = subparsers.add_parser("hash", help="print SHA checksums of files")
+    hash_parser.add_argument("--algo", choices=sorted(ALGORITHMS), default="sha256",
+                             help="hash algorithm (default: sha256)")
+    hash_parser.add_argument("--checkpoint-dir", metavar="DIR",
+                             help="save the midstate of each file to DIR as it is hashed, and resume "
+                                  "from it when the same file is hashed again after an interruption")
+    hash_parser.add_argument("--checkpoint-every", type=int, default=RESUME_BLOCKS, metavar="BLOCKS",
+                             help=f"blocks between checkpoints (default: {RESUME_BLOCKS})")
+    hash_parser.add_argument("--tree", action="store_true",
+                             help="hash fixed-size leaves in parallel and print the root of their Merkle tree "
+                                  "as ALGO-tree-LEAF:ROOT; this differs from the plain digest")
+    hash_parser.add_argument("--leaf-size", default="1M", metavar="SIZE",
+                             help="leaf size for --tree, such as 64K or 1M (default: 1M)")
+    hash_parser.add_argument("--workers", type=int, default=None,
+                             help="worker processes for --tree (default: one per CPU)")
+    hash_parser.add_argument("files", nargs="*", default=["-"],
+                             help="files to hash; '-' or nothing reads stdin")
+    hash_parser.set_defaults(func=cli_hash)
+    
+    batch_parser = subparsers.add_parser("batch", help="hash many files or messages in parallel")
+    batch_parser.add_argument("--algo", choices=sorted(ALGORITHMS), default="sha256",
+                              help="hash algorithm (default: sha256)")
+    batch_parser.add_argument("--workers", type=int, default=None,
+                              help="worker processes (default: one per CPU)")
+    batch_parser.add_argument("--chunksize", type=int, default=16,
+                              help="items handed to a worker at a time (default: 16)")
+    batch_parser.add_argument("--unordered", action="store_true",
+                              help="print results as they complete instead of in input order")
+    batch_parser.add_argument("--messages", action="store_true",
+                              help="treat items as messages to hash rather than file paths")
+    batch_parser.add_argument("--vectorized", action="store_true",
+                              help="hash messages in lockstep with the NumPy engine instead of worker processes")
+    batch_parser.add_argument("--prefix-cache", type=int, default=0, metavar="MB",
+                              help="keep H0-H7 after every block in a cache of MB megabytes per worker, "
+                                   "so items sharing long prefixes skip them (default: off)")
+    batch_parser.add_argument("--items-from", metavar="LIST",
+                              help="also read items, one per line, from LIST ('-' for stdin)")
+    batch_parser.add_argument("items", nargs="*", help="files (or messages with --messages) to hash")
+    batch_parser.set_defaults(func=cli_batch)
+    
+    bench_parser = subparsers.add_parser("bench", help="measure hash throughput and frame times")
+    bench_parser.add_argument("--algo", choices=sorted(ALGORITHMS), action="append",
+                              help="algorithm to benchmark; repeat for several (default: sha256 and sha512, "
+                                   "whose compression the other variants share)")
+    bench_parser.add_argument("--sizes", nargs="+", metavar="SIZE",
+                              help="message sizes such as 0 64 1K 1M 100M (default: 0 64 1K 64K 1M)")
+    bench_parser.add_argument("--min-time", type=float, default=0.2,
+                              help="seconds to repeat each measurement for (default: 0.2)")
+    bench_parser.add_argument("--frames", type=int, default=30,
+                              help="frames drawn per scene (default: 30)")
+    bench_parser.add_argument("--pbkdf2-iterations", type=int, default=1000, metavar="N",
+                              help="iterations per PBKDF2-HMAC derivation (default: 1000)")
+    bench_parser.add_argument("--no-render", action="store_true",
+                              help="skip the frame timings, which need pygame")
+    bench_parser.add_argument("--json", metavar="PATH",
+                              help="also write the results as JSON to PATH ('-' for stdout)")
+    bench_parser.add_argument("--trace", metavar="PATH",
+                              help="record a span per pipeline stage and scene and write them to PATH as "
+                                   "Chrome trace-event JSON; the timings then include the recording cost")
+    bench_parser.set_defaults(func=cli_bench)
+    
+    gui_parser = subparsers.add_parser("gui", help="open the visualizer, optionally profiling it")
+    gui_parser.add_argument("--profile", metavar="PATH",
+                            help="record a span per pipeline stage, scene and text render, and write them to "
+                                 "PATH as Chrome trace-event JSON on exit")
+    gui_parser.add_argument("--hud", action="store_true",
+                            help="start with the timing overlay shown (F3 toggles it)")
+    gui_parser.set_defaults(func=cli_gui)
+    
+    verify_parser = subparsers.add_parser("verify", help="check every hashing path against known answers and hashlib")
+    verify_parser.add_argument("--algo", choices=sorted(ALGORITHMS), action="append",
+                               help="algorithm to verify; repeat for several (default: all)")
+    verify_parser.add_argument("--cases", type=int, default=200,
+                               help="randomized messages per algorithm (default: 200)")
+    verify_parser.add_argument("--max-blocks", type=int, default=4,
+                               help="largest randomized message in blocks (default: 4)")
+    verify_parser.add_argument("--seed", type=int, default=0,
+                               help="seed of the randomized messages (default: 0)")
+    verify_parser.add_argument("--long", action="store_true",
+                               help="also hash the one-million-'a' long message vectors")
+    verify_parser.add_argument("--vectors", metavar="RSP", action="append",
+                               help="NIST SHAVS response file (e.g. SHA256ShortMsg.rsp) to check as well")
+    verify_parser.add_argument("--workers", type=int, default=None,
+                               help="worker processes (default: one per CPU)")
+    verify_parser.set_defaults(func=cli_verify)
+    
+    args = parser.parse_args(argv)
+    args.prog = parser.prog
+    return args.func(args)
@@ -0,0 +1,1944 @@
+import pygame
+import pygame.freetype
+import os
+import sys
+import math
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import List, Tuple, Dict, Any, Optional
+
+from cache import LRUCache, message_key
+from hashing import ALGORITHMS, READ_SIZE, BitView, BlockWalk, MessageBlocks, hash_checkpointed, read_file, sha256
+from jobs import Job, JobCancelled, JobRunner
+from keyed import hmac_key, key_cache
+from tree import DEFAULT_LEAF_SIZE, format_tree_digest, tree_hash_bytes
+
+# Configuration
+CONFIG = {
+    "width": 1200,
+    "height": 800,
+    "bg_color": (240, 240, 240),
+    "text_color": (20, 20, 20),
+    "highlight_color": (255, 140, 0),
+    "box_color": (200, 200, 200),
+    "box_highlight": (180, 180, 180),
+    "button_color": (100, 100, 240),
+    "button_hover_color": (80, 80, 220),
+    "button_text_color": (255, 255, 255),
+    "padding": 25,
+    "text_padding": 14,
+    "font_size": 18,
+    "title_font_size": 22,
+    "small_font_size": 14,
+    "animation_speed": 1.0,
+    "fps": 60,
+    "inactive_color": (180, 180, 180),  # Gray color for inactive buttons
+    "button_border_color": (100, 100, 100),  # Border color for buttons
+    "subtitle_color": (80, 80, 80),  # Dark gray for subtitles
+    "radio_selected_color": (50, 150, 50),  # Green for selected radio button
+    "radio_unselected_color": (150, 150, 150),  # Gray for unselected radio button
+    "explanation_bg_color": (230, 230, 230),  # Background color for explanation text
+    "explanation_text_color": (20, 20, 20),   # Text color for explanation
+    "explanation_padding": 5,                 # Padding around explanation text
+    "explanation_font_size": 16,              # Font size for explanation text
+    "explanation_max_width": 600,             # Maximum width for explanation text
+    "explanation_x_offset": 200,               # Horizontal offset from prev button
+    "explanation_y_offset": 0,                # Vertical offset from bottom padding
+    "explanation_position": "bottom",         # Position: "bottom", "top", or "custom"
+    "explanation_custom_x": 500,              # Custom X position (if position is "custom")
+    "explanation_custom_y": 700,              # Custom Y position (if position is "custom")
+    "result_cache_entries": 32,               # Hashed messages kept for instant re-visits
+    "result_cache_bytes": 64 * 1024 * 1024,   # Memory limit for cached messages and padded blocks
+    "trace_cache_bytes": 32 * 1024 * 1024,    # Memory limit for cached schedules and round traces
+    "text_cache_entries": 2048,               # Rendered text surfaces kept between frames
+    "text_cache_bytes": 16 * 1024 * 1024,     # Memory limit for rendered text surfaces
+    "idle_timeout_ms": 1000,                  # Longest sleep of the main loop while nothing changes
+    "scroll_rows": 3,                         # Rows scrolled per mouse wheel notch in bit views
+    "scrollbar_color": (170, 170, 170),       # Scrollbar thumb of bit views
+    "progress_color": (100, 180, 100),        # Filled part of the file hashing progress bar
+    "progress_poll_ms": 100,                  # How often the progress bar updates while hashing
+    "open_file_at": "first",                  # Block shown after opening a file: "first" or "last" (Shift flips it)
+    "background_hash_bytes": 4096,            # Longer messages are hashed on the worker thread
+    "text_box_render_chars": 256,             # Characters at the end of the input that get rendered
+    "tree_leaf_bytes": DEFAULT_LEAF_SIZE,     # Tree view leaves of files, the same as main.py hash --tree
+    "tree_message_leaf_bytes": 64,            # Tree view leaves of typed messages, small enough to branch
+    "tree_node_width": 96,                    # Horizontal space per leaf in the tree view
+    "hmac_default_key": "key",                # Key the HMAC view starts with
+    "hud_frames": 60,                         # Frames averaged by the F3 timing overlay
+    "hud_width": 380,                         # Width of the timing overlay
+    "hud_bg_color": (40, 40, 40),             # Background of the timing overlay
+    "hud_text_color": (235, 235, 235)         # Text of the timing overlay
+}
+
+# Posted by the background job runner when a job has finished
+JOB_DONE = pygame.USEREVENT + 1
+
+# Where each algorithm's initial hash values come from, shown in the initialize scene
+INIT_VALUE_SOURCES = {
+    "SHA-224": "The initial hash values are the second 32 bits of the fractional parts of the square roots of the 9th to 16th primes.",
+    "SHA-256": "The initial hash values are the first 32 bits of the fractional parts of the square roots of the first 8 prime numbers.",
+    "SHA-384": "The initial hash values are the first 64 bits of the fractional parts of the square roots of the 9th to 16th primes.",
+    "SHA-512": "The initial hash values are the first 64 bits of the fractional parts of the square roots of the first 8 prime numbers.",
+    "SHA-512/224": "The initial hash values are SHA-512 of 'SHA-512/224', started from its own values XORed with a5a5...a5.",
+    "SHA-512/256": "The initial hash values are SHA-512 of 'SHA-512/256', started from its own values XORed with a5a5...a5.",
+}
+
+# Rough per-block overhead of a cached result: the block view and its chaining values
+RESULT_BYTES_PER_BLOCK = 512
+
+# Fonts are created by init_pygame() once the GUI starts
+font = None
+title_font = None
+small_font = None
+explanation_font = None
+
+# Rendered text surfaces keyed by (font, text, color). Scenes redraw the
+# same strings every frame, so most renders become a lookup and a blit.
+text_cache = LRUCache(max_bytes=CONFIG["text_cache_bytes"], max_entries=CONFIG["text_cache_entries"])
+
+def render_font(text_font, text, color):
+    """text_font.render(text, color); every glyph render goes through here so it can be profiled"""
+    return text_font.render(text, color)
+
+def render_text(text_font, text, color):
+    """Cached equivalent of text_font.render(text, color)"""
+    key = (text_font, text, color)
+    rendered = text_cache.get(key)
+    if rendered is None:
+        rendered = render_font(text_font, text, color)
+        surf = rendered[0]
+        text_cache.put(key, rendered, surf.get_width() * surf.get_height() * surf.get_bytesize())
+    return rendered
+
+def bit_rows(bits, suffix="", show_hex=False):
+    """Row count and formatter for bits shown 64 per row in groups of 8.
+    
+    bits is a BitView over the message bytes; suffix is extra bits shown
+    after it (the appended '1' of the padding step). With show_hex rows
+    are (bits, hex) column pairs. Rows are formatted from the bytes only
+    when asked for.
+    """
+    total = len(bits) + len(suffix)
+    
+    def format_row(row):
+        start = row * 64
+        stop = min(start + 64, total)
+        chunk = bits[start:stop] + suffix[max(0, start - len(bits)):max(0, stop - len(bits))]
+        text = ' '.join(chunk[j:j+8] for j in range(0, len(chunk), 8))
+        if show_hex:
+            return text, bits.hex(row * 8, row * 8 + 8)
+        return text
+        
+    return (total + 63) // 64, format_row
+
+def preview_text(text, text_font, max_width, limit=30):
+    """Render text on one line, shortened to limit characters when it is too wide"""
+    # Never render megabytes of text just to find out it does not fit
+    shown = text if len(text) <= 4 * limit else text[:4 * limit]
+    surf, rect = render_text(text_font, shown, CONFIG["text_color"])
+    if rect.width > max_width or shown != text:
+        surf, rect = render_text(text_font, text[:limit] + "...", CONFIG["text_color"])
+    return surf, rect
+
+# UI Components
+class TextBox:
+    def __init__(self, x: int, y: int, width: int, height: int, font: pygame.freetype.Font, text: str = ""):
+        self.rect = pygame.Rect(x, y, width, height)
+        self.color = CONFIG["box_color"]
+        self.text = text
+        self.font = font
+        self.active = False
+        self.cursor_visible = True
+        self.cursor_timer = 0
+        self.visible = True
+        self.needs_redraw = True
+        self.render()
+        
+    def render(self):
+        # Only the end of the text can be visible, so long pastes cost no more than short ones
+        shown = self.text[-CONFIG["text_box_render_chars"]:]
+        self.text_surface, self.text_rect = render_font(self.font, shown, CONFIG["text_color"])
+        
+    def handle_event(self, event: pygame.event.Event) -> bool:
+        if event.type == pygame.MOUSEBUTTONDOWN:
+            active = self.rect.collidepoint(event.pos)
+            if active != self.active:
+                self.active = active
+                self.needs_redraw = True
+            return True
+            
+        if event.type == pygame.KEYDOWN and self.active:
+            self.needs_redraw = True
+            if event.key == pygame.K_RETURN:
+                self.active = False
+                return True
+            elif event.key == pygame.K_BACKSPACE:
+                self.text = self.text[:-1]
+            elif event.key == pygame.K_v and event.mod & pygame.KMOD_CTRL:
+                pasted = pygame.scrap.get(pygame.SCRAP_TEXT)
+                if pasted:
+                    self.text += pasted.decode("utf-8", "replace").rstrip("\x00")
+            elif event.unicode.isprintable():
+                self.text += event.unicode
+                
+            self.render()
+            return True
+            
+        return False
+        
+    def update(self, dt: float):
+        self.cursor_timer += dt
+        if self.cursor_timer >= 0.5:
+            self.cursor_visible = not self.cursor_visible
+            self.cursor_timer = 0
+            # The cursor is only drawn while the box is active
+            if self.active:
+                self.needs_redraw = True
+                
+    def time_to_blink(self) -> float:
+        return max(0.0, 0.5 - self.cursor_timer)
+        
+    def draw(self, surface: pygame.Surface):
+        if self.active:
+            color = CONFIG["box_highlight"]
+        else:
+            color = self.color
+            
+        pygame.draw.rect(surface, color, self.rect, 0)
+        pygame.draw.rect(surface, CONFIG["text_color"], self.rect, 2)
+        
+        # Render text with padding, clipped to the box so it can be redrawn on its own
+        text_padding = CONFIG["text_padding"]
+        previous_clip = surface.get_clip()
+        surface.set_clip(self.rect)
+        # Keep the end of the text, where the cursor is, in view
+        text_x = min(self.rect.x + text_padding, self.rect.right - text_padding - self.text_rect.width)
+        surface.blit(self.text_surface, (text_x, self.rect.y + (self.rect.height - self.text_rect.height) // 2))
+        
+        # Draw cursor
+        if self.active and self.cursor_visible:
+            cursor_pos = text_x + self.text_rect.width
+            cursor_height = self.text_rect.height
+            pygame.draw.line(
+                surface,
+                CONFIG["text_color"],
+                (cursor_pos, self.rect.y + (self.rect.height - cursor_height) // 2),
+                (cursor_pos, self.rect.y + (self.rect.height + cursor_height) // 2),
+                2
+            )
+        surface.set_clip(previous_clip)
+
+class Button:
+    def __init__(self, x: int, y: int, width: int, height: int, text: str, font: pygame.freetype.Font, callback: callable, active: bool = True):
+        self.rect = pygame.Rect(x, y, width, height)
+        self.text = text
+        self.font = font
+        self.callback = callback
+        self.hovered = False
+        self.active = active
+        self.visible = True
+        self.needs_redraw = True
+        self.text_surf, self.text_rect = render_font(font, text, CONFIG["text_color"])
+        
+    def draw(self, surface: pygame.Surface):
+        # Choose color based on state
+        if not self.active:
+            color = CONFIG["inactive_color"]
+        elif self.hovered:
+            color = CONFIG["button_hover_color"]
+        else:
+            color = CONFIG["button_color"]
+            
+        # Draw button
+        pygame.draw.rect(surface, color, self.rect, border_radius=5)
+        pygame.draw.rect(surface, CONFIG["button_border_color"], self.rect, 2, border_radius=5)
+        
+        # Center text
+        text_pos = (
+            self.rect.x + (self.rect.width - self.text_rect.width) // 2, 
+            self.rect.y + (self.rect.height - self.text_rect.height) // 2
+        )
+        surface.blit(self.text_surf, text_pos)
+        
+    def handle_event(self, event: pygame.event.Event) -> bool:
+        if not self.active:
+            return False
+            
+        if event.type == pygame.MOUSEMOTION:
+            hovered = self.rect.collidepoint(event.pos)
+            if hovered != self.hovered:
+                self.hovered = hovered
+                self.needs_redraw = True
+        elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+            if self.rect.collidepoint(event.pos):
+                self.callback()
+                return True
+        return False
+
+class RadioButton:
+    def __init__(self, x, y, radius, text, font, selected=False, callback=None):
+        self.x = x
+        self.y = y
+        self.radius = radius
+        self.text = text
+        self.font = font
+        self.selected = selected
+        self.callback = callback
+        self.group = None
+        self.visible = True
+        self.needs_redraw = True
+        self.text_surf, self.text_rect = render_font(font, text, CONFIG["text_color"])
+        self.move_to(x, y)
+        
+    def move_to(self, x, y):
+        self.x = x
+        self.y = y
+        # Area covered by the circle and label, for partial redraws and hit-testing
+        self.rect = pygame.Rect(x - self.radius, min(y - self.radius, y - self.text_rect.height // 2),
+                                2 * self.radius + 5 + self.text_rect.width,
+                                max(2 * self.radius, self.text_rect.height) + 1)
+                                
+    def draw(self, surface):
+        # Draw outer circle
+        pygame.draw.circle(surface, CONFIG["text_color"], (self.x, self.y), self.radius, 1)
+        
+        # Draw inner circle if selected
+        if self.selected:
+            pygame.draw.circle(surface, CONFIG["radio_selected_color"], 
+                             (self.x, self.y), self.radius - 3)
+                             
+        # Draw text
+        surface.blit(self.text_surf, (self.x + self.radius + 5, 
+                                    self.y - self.text_rect.height // 2))
+                                    
+    def handle_event(self, event):
+        if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+            # Check if click is within the circle
+            dx = event.pos[0] - self.x
+            dy = event.pos[1] - self.y
+            if dx*dx + dy*dy <= self.radius*self.radius:
+                self.selected = True
+                self.needs_redraw = True
+                if self.group:
+                    self.group.deselect_others(self)
+                if self.callback:
+                    self.callback()
+                return True
+        return False
+
+class RadioGroup:
+    def __init__(self, buttons):
+        self.buttons = buttons
+        for button in buttons:
+            button.group = self
+            
+    def handle_event(self, event):
+        for button in self.buttons:
+            if button.handle_event(event):
+                return True
+        return False
+        
+    def deselect_others(self, selected):
+        for other in self.buttons:
+            if other != selected and other.selected:
+                other.selected = False
+                other.needs_redraw = True
+                
+    def draw(self, surface):
+        for button in self.buttons:
+            button.draw(surface)
+            
+    def get_selected(self):
+        for button in self.buttons:
+            if button.selected:
+                return button.text
+        return None
+
+class ScrollPane:
+    """Scrollable rows of text; only the rows inside the pane are formatted and rendered.
+    
+    A row is a string, or a tuple of strings drawn at column_offsets.
+    """
+    def __init__(self, x: int, y: int, width: int, height: int, font: pygame.freetype.Font, line_height: int):
+        self.rect = pygame.Rect(x, y, width, height)
+        self.font = font
+        self.line_height = line_height
+        self.row_count = 0
+        self.format_row = None
+        self.first_row = 0
+        self.column_offsets = (0,)
+        self.visible = True
+        self.needs_redraw = True
+        
+    def set_rows(self, row_count, format_row):
+        self.row_count = row_count
+        self.format_row = format_row
+        self.first_row = 0
+        self.needs_redraw = True
+        
+    def page_rows(self) -> int:
+        return max(1, self.rect.height // self.line_height)
+        
+    def scroll_to(self, row: int):
+        row = max(0, min(row, self.row_count - self.page_rows()))
+        if row != self.first_row:
+            self.first_row = row
+            self.needs_redraw = True
+            
+    def handle_event(self, event: pygame.event.Event) -> bool:
+        if event.type == pygame.MOUSEWHEEL and self.rect.collidepoint(pygame.mouse.get_pos()):
+            self.scroll_to(self.first_row - event.y * CONFIG["scroll_rows"])
+            return True
+        return False
+        
+    def draw(self, surface: pygame.Surface):
+        if not self.format_row:
+            return
+        last_row = min(self.first_row + self.page_rows(), self.row_count)
+        for i, row in enumerate(range(self.first_row, last_row)):
+            columns = self.format_row(row)
+            if isinstance(columns, str):
+                columns = (columns,)
+            for offset, text in zip(self.column_offsets, columns):
+                row_surf, _ = render_text(self.font, text, CONFIG["text_color"])
+                surface.blit(row_surf, (self.rect.x + offset, self.rect.y + i * self.line_height))
+                
+        # Scrollbar thumb along the right edge when not everything fits
+        if self.row_count > self.page_rows():
+            thumb_height = max(10, self.rect.height * self.page_rows() // self.row_count)
+            thumb_y = self.rect.y + (self.rect.height - thumb_height) * self.first_row // (self.row_count - self.page_rows())
+            pygame.draw.rect(surface, CONFIG["scrollbar_color"],
+                             (self.rect.right - 6, thumb_y, 6, thumb_height), border_radius=3)
+
+class ProgressBar:
+    """Progress of a background job with its throughput, or a status message"""
+    def __init__(self, x: int, y: int, width: int, height: int, font: pygame.freetype.Font):
+        self.rect = pygame.Rect(x, y, width, height)
+        self.font = font
+        self.job = None
+        self.message = ""
+        self.shown_done = -1
+        self.visible = True
+        self.needs_redraw = True
+        
+    def track(self, job):
+        self.job = job
+        self.message = ""
+        self.shown_done = -1
+        self.needs_redraw = True
+        
+    def show_message(self, message):
+        self.job = None
+        self.message = message
+        self.needs_redraw = True
+        
+    def update(self, dt: float):
+        # Progress is written by the worker thread; repaint when it moved
+        if self.job is not None and self.job.done != self.shown_done:
+            self.needs_redraw = True
+            
+    def handle_event(self, event: pygame.event.Event) -> bool:
+        return False
+        
+    def draw(self, surface: pygame.Surface):
+        if self.job is None:
+            if self.message:
+                text_surf, text_rect = render_text(self.font, self.message, CONFIG["subtitle_color"])
+                surface.blit(text_surf, (self.rect.x, self.rect.centery - text_rect.height // 2))
+            return
+            
+        job = self.job
+        self.shown_done = job.done
+        pygame.draw.rect(surface, CONFIG["box_color"], self.rect, border_radius=5)
+        filled = self.rect.copy()
+        filled.width = int(self.rect.width * job.fraction())
+        pygame.draw.rect(surface, CONFIG["progress_color"], filled, border_radius=5)
+        pygame.draw.rect(surface, CONFIG["button_border_color"], self.rect, 1, border_radius=5)
+        
+        # Rendered directly: the text changes every update, so caching it would only churn
+        text = (f"{job.description}: {job.done / 1e6:.2f} / {job.total / 1e6:.2f} MB"
+                f"  ({job.rate() / 1e6:.2f} MB/s)  Esc to cancel")
+        text_surf, text_rect = render_font(self.font, text, CONFIG["text_color"])
+        surface.blit(text_surf, (self.rect.x + 10, self.rect.centery - text_rect.height // 2))
+
+class Hud:
+    """Frame time, FPS, cache hit rates and hash throughput drawn over the scene; F3 toggles it"""
+    def __init__(self, font: pygame.freetype.Font):
+        self.font = font
+        self.rect = pygame.Rect(0, 0, CONFIG["hud_width"], 0)
+        self.visible = False
+        self.frames = deque(maxlen=CONFIG["hud_frames"])  # (seconds between frames, seconds in draw())
+        self.last_job = None  # (description, bytes per second) of the last finished job
+        
+    def record_frame(self, frame_seconds, draw_seconds):
+        self.frames.append((frame_seconds, draw_seconds))
+        
+    def job_finished(self, job):
+        self.last_job = (job.description, job.rate())
+        
+    def lines(self, visualization):
+        lines = []
+        if self.frames:
+            frame = sum(frame for frame, _ in self.frames) / len(self.frames)
+            draw = sum(draw for _, draw in self.frames) / len(self.frames)
+            worst = max(draw for _, draw in self.frames)
+            fps = 1 / frame if frame > 0 else 0.0
+            lines.append(f"Frame {frame * 1000:.1f} ms  {fps:.0f} FPS  draw {draw * 1000:.2f} ms (max {worst * 1000:.2f})")
+        else:
+            lines.append("Frame -")
+        lines.append(f"Text cache {text_cache.hit_rate():.1%} of {text_cache.hits + text_cache.misses:,} lookups, "
+                     f"{len(text_cache):,} surfaces")
+        lines.append(f"Results {visualization.result_cache.hit_rate():.1%}  traces {visualization.trace_cache.hit_rate():.1%}"
+                     f"  HMAC keys {key_cache.hit_rate():.1%}")
+        job = visualization.job
+        if job is not None and job.running():
+            lines.append(f"{job.description}: {job.rate() / 1e6:.2f} MB/s")
+        elif self.last_job is not None:
+            description, rate = self.last_job
+            lines.append(f"Last job, {description}: {rate / 1e6:.2f} MB/s")
+        else:
+            lines.append("No hash jobs yet")
+        if visualization.profiler is not None:
+            lines.append(f"Profiling: {len(visualization.profiler.events):,} spans")
+        return lines
+        
+    def draw(self, surface: pygame.Surface, visualization):
+        # Rendered directly: the numbers change every frame, so caching them would only churn
+        rendered = [render_font(self.font, line, CONFIG["hud_text_color"]) for line in self.lines(visualization)]
+        line_height = self.font.get_sized_height() + 4
+        self.rect.height = len(rendered) * line_height + 12
+        self.rect.bottomright = (surface.get_width() - CONFIG["padding"],
+                                 visualization.reset_button.rect.top - CONFIG["padding"])
+        pygame.draw.rect(surface, CONFIG["hud_bg_color"], self.rect, border_radius=5)
+        for i, (text_surf, _) in enumerate(rendered):
+            surface.blit(text_surf, (self.rect.x + 8, self.rect.y + 6 + i * line_height))
+
+def hash_job(job, algorithm, data, at_end=False):
+    """Background job: hash a message, or the file at job.path when data is None.
+    
+    Returns (data, hexdigest, walk). The walk has checkpointed chaining
+    values and the block the visualization opens on already traced, in a
+    cache private to the walk until BlockWalk.share_traces() is called.
+    """
+    if data is None:
+        data = read_file(job.path)
+    digest, checkpoints = hash_checkpointed(algorithm, data, progress=job.advance)
+    walk = BlockWalk(algorithm, MessageBlocks(algorithm, data), checkpoints=checkpoints)
+    walk.trace(len(walk) - 1 if at_end else 0)
+    job.advance(job.total)
+    return data, digest, walk
+
+def tree_job(job, algorithm, data, leaf_size):
+    """Background job: the Merkle tree levels of data, from the leaves up to the root"""
+    return tree_hash_bytes(algorithm, data, leaf_size, progress=job.advance)
+
+def hmac_job(job, key, data):
+    """Background job: (inner digest, HMAC) of data under an HMACKey"""
+    mac = key.new()
+    for offset in range(0, len(data), READ_SIZE):
+        mac.update(data[offset:offset + READ_SIZE])
+        job.advance(min(len(data), offset + READ_SIZE))
+    return mac.inner_digest(), mac.digest()
+
+class WidgetRegistry:
+    """Widgets of each scene, hit-tested through a coarse spatial grid.
+    
+    Mouse events only reach the widget under the pointer (plus the focused
+    widget for clicks, so text boxes can lose focus); other events go to
+    every widget of the scene.
+    """
+    CELL_SIZE = 64
+    
+    def __init__(self):
+        self.scenes = {}  # scene -> widgets in registration order
+        self.grid = {}    # (scene, cell x, cell y) -> widgets overlapping that cell
+        self.hovered = None
+        
+    def register(self, scenes, *widgets):
+        for scene in scenes:
+            self.scenes.setdefault(scene, []).extend(widgets)
+        self.rebuild_index()
+        
+    def widgets_for(self, scene):
+        return self.scenes.get(scene, [])
+        
+    def rebuild_index(self):
+        """Re-index widget rects; call after widgets move"""
+        self.grid = {}
+        cell = self.CELL_SIZE
+        for scene, widgets in self.scenes.items():
+            for widget in widgets:
+                rect = widget.rect
+                for cx in range(rect.left // cell, (rect.right - 1) // cell + 1):
+                    for cy in range(rect.top // cell, (rect.bottom - 1) // cell + 1):
+                        self.grid.setdefault((scene, cx, cy), []).append(widget)
+                        
+    def widget_at(self, scene, pos):
+        cell = self.CELL_SIZE
+        for widget in self.grid.get((scene, pos[0] // cell, pos[1] // cell), ()):
+            if widget.visible and widget.rect.collidepoint(pos):
+                return widget
+        return None
+        
+    def dispatch(self, scene, event):
+        if event.type == pygame.MOUSEMOTION:
+            target = self.widget_at(scene, event.pos)
+            if self.hovered is not None and self.hovered is not target:
+                # Let the previous widget see the pointer leave
+                self.hovered.handle_event(event)
+            self.hovered = target
+            if target is not None:
+                target.handle_event(event)
+        elif event.type == pygame.MOUSEBUTTONDOWN:
+            target = self.widget_at(scene, event.pos)
+            for widget in self.widgets_for(scene):
+                if isinstance(widget, TextBox) and widget is not target:
+                    widget.handle_event(event)
+            if target is not None:
+                target.handle_event(event)
+        else:
+            for widget in self.widgets_for(scene):
+                if widget.visible:
+                    widget.handle_event(event)
+
+class Visualization:
+    def __init__(self):
+        self.current_scene = "intro"
+        self.animation_time = 0
+        self.message = ""
+        self.binary_message = ""
+        self.padded_message = ""
+        self.blocks = []
+        self.current_block_index = 0
+        self.walk = None
+        self.schedule = None
+        self.trace = None
+        self.hash_values = []
+        self.previous_hash_values = []
+        self.compression_step = 0
+        self.final_hash = ""
+        self.step_index = 0
+        self.sub_step_index = 0
+        self.highlight_index = -1
+        self.explanation = ""
+        self.current_algorithm = sha256  # Default algorithm
+        self.source_path = None  # File being visualized, None for typed messages
+        
+        # Merkle tree of the current message, computed when the tree scene is first shown
+        self.tree_levels = None
+        self.tree_key = None
+        self.tree_leaf_size = 0
+        
+        # HMAC of the current message under the key typed in the HMAC scene
+        self.hmac_key = None  # HMACKey with the compressed pad blocks
+        self.hmac_digests = None  # (inner digest, HMAC)
+        self.hmac_state = None  # (algorithm, message hash, key) the digests belong to
+        
+        # Timing overlay, and the profiler when main() was asked to record spans
+        self.hud = Hud(small_font)
+        self.profiler = None
+        
+        # Files are hashed on a worker thread; JOB_DONE brings the result back
+        self.jobs = JobRunner(lambda job: pygame.event.post(pygame.event.Event(JOB_DONE, job=job)))
+        self.job = None
+        
+        # Results and traces of earlier messages, keyed by (algorithm, message digest)
+        self.result_cache = LRUCache(max_bytes=CONFIG["result_cache_bytes"],
+                                     max_entries=CONFIG["result_cache_entries"])
+        self.trace_cache = LRUCache(max_bytes=CONFIG["trace_cache_bytes"])
+        
+        # Static layer of the current scene; widgets are drawn on top of it
+        self.scene_layer = None
+        self.scene_layer_key = None
+        
+        # Widgets are created once here and positioned by layout()
+        self.text_box = TextBox(0, 0, 0, 40, font)
+        self.hash_button = Button(0, 0, 90, 40, "Hash", font, self.start_hash)
+        self.open_button = Button(0, 0, 120, 30, "Open File...", small_font, self.open_file_dialog)
+        self.progress_bar = ProgressBar(0, 0, 0, 30, small_font)
+        
+        # Algorithm selection radio buttons, one per engine algorithm
+        self.radio_group = RadioGroup([
+            RadioButton(0, 0, 8, algorithm.name, font, algorithm is self.current_algorithm,
+                        lambda algorithm=algorithm: self.set_algorithm(algorithm))
+            for algorithm in ALGORITHMS.values()
+        ])
+        
+        # Navigation buttons
+        button_width = 100
+        button_height = 40
+        self.prev_button = Button(0, 0, button_width, button_height, "Previous", font, self.previous_step)
+        self.next_button = Button(0, 0, button_width, button_height, "Next", font, self.next_step)
+        self.reset_button = Button(0, 0, button_width, button_height, "Reset", font, self.reset)
+        
+        # Block navigation buttons, shown in the per-block scenes
+        block_button_width = 110
+        self.prev_block_button = Button(0, 0, block_button_width, 25, "< Block", font,
+                                        lambda: self.go_to_block(self.current_block_index - 1))
+        self.next_block_button = Button(0, 0, block_button_width, 25, "Block >", font,
+                                        lambda: self.go_to_block(self.current_block_index + 1))
+                                        
+        # Scene-specific buttons
+        self.skip_to_end_btn = Button(0, 0, 120, 25, "Skip to End", small_font, self.skip_to_end)
+        self.copy_msg_btn = Button(0, 0, 80, 25, "Copy", small_font, self.copy_message)
+        self.copy_hash_btn = Button(0, 0, 80, 25, "Copy", small_font, self.copy_hash)
+        self.tree_btn = Button(0, 0, 120, 30, "Tree View", small_font, self.show_tree)
+        self.hmac_btn = Button(0, 0, 120, 30, "HMAC View", small_font, self.show_hmac)
+        self.hmac_key_box = TextBox(0, 0, 400, 40, font, CONFIG["hmac_default_key"])
+        self.hmac_mac_button = Button(0, 0, 90, 40, "MAC", font, self.start_hmac)
+        
+        # Bit views of the message; panes are sized to the message in layout_panes()
+        line_height = CONFIG["font_size"] + 5
+        self.binary_pane = ScrollPane(0, 0, 0, 0, font, line_height)
+        self.append_pane = ScrollPane(0, 0, 0, 0, font, line_height)
+        self.padded_pane = ScrollPane(0, 0, 0, 0, font, line_height)
+        self.block_pane = ScrollPane(0, 0, 0, 0, font, line_height)
+        
+        # Which widgets belong to which scene
+        self.widgets = WidgetRegistry()
+        self.widgets.register(["intro"], self.text_box, self.hash_button, *self.radio_group.buttons,
+                              self.open_button)
+        self.widgets.register(["intro", "tree", "hmac"], self.progress_bar)
+        self.widgets.register(["preprocessing", "parsing", "initialize", "prepare_schedule", "compression", "final",
+                               "tree", "hmac"],
+                              self.prev_button, self.next_button, self.reset_button)
+        self.widgets.register(["parsing", "prepare_schedule", "compression"],
+                              self.prev_block_button, self.next_block_button)
+        self.widgets.register(["compression"], self.skip_to_end_btn)
+        self.widgets.register(["final"], self.copy_msg_btn, self.copy_hash_btn, self.tree_btn, self.hmac_btn)
+        self.widgets.register(["hmac"], self.hmac_key_box, self.hmac_mac_button)
+        self.widgets.register(["preprocessing"], self.binary_pane, self.append_pane, self.padded_pane)
+        self.widgets.register(["parsing"], self.block_pane)
+        
+        self.layout(CONFIG["width"], CONFIG["height"])
+        
+        # Update scene descriptions
+        self.update_scene_descriptions()
+        
+    def layout(self, width, height):
+        """Position every widget for a window size; only needed again on resize"""
+        padding = CONFIG["padding"]
+        button_spacing = 10
+        
+        self.content_rect = pygame.Rect(
+            padding,
+            padding * 4 + 60,
+            width - 2 * padding,
+            height - padding * 6 - 60
+        )
+        
+        # Text input box with the hash button to its right
+        input_width = width - 2 * padding - 100  # Leave space for button
+        self.text_box.rect = pygame.Rect(padding, padding, input_width, 40)
+        self.hash_button.rect.topleft = (padding + input_width + 10, padding)
+        
+        # Algorithm selection radio buttons - columns of three under the hash
+        # button, right-aligned so the longest names stay inside the window
+        radios = self.radio_group.buttons
+        column_width = max(radio.rect.width for radio in radios) + 15
+        columns = (len(radios) + 2) // 3
+        radio_x = width - padding - columns * column_width + 15 + radios[0].radius
+        radio_y = padding + 50  # Position below the hash button (40px height + 10px gap)
+        for i, radio in enumerate(radios):
+            radio.move_to(radio_x + i // 3 * column_width, radio_y + i % 3 * 25)  # 25px apart
+            
+        # File opening below the scene description, with the progress of the hash next to it
+        self.open_button.rect.topleft = (padding, self.content_rect.y)
+        self.progress_bar.rect = pygame.Rect(self.open_button.rect.right + button_spacing, self.content_rect.y,
+                                             input_width - self.open_button.rect.width - button_spacing, 30)
+                                             
+        # Navigation buttons along the bottom
+        bottom_y = height - padding - self.prev_button.rect.height
+        self.prev_button.rect.topleft = (padding, bottom_y)
+        self.next_button.rect.topleft = (self.prev_button.rect.right + button_spacing, bottom_y)
+        self.reset_button.rect.topleft = (width - padding - self.reset_button.rect.width, bottom_y)
+        
+        # Block navigation in the top right corner of the content area
+        self.next_block_button.rect.topright = (width - padding, self.content_rect.y)
+        self.prev_block_button.rect.topright = (self.next_block_button.rect.x - button_spacing, self.content_rect.y)
+        
+        # Skip to End sits after the widest compression title so it never moves
+        widest_title = "Compression Function (Round 80/80):"
+        _, title_rect = render_text(title_font, widest_title, CONFIG["subtitle_color"])
+        self.skip_to_end_btn.rect.topleft = (self.content_rect.x + title_rect.width + 20, self.content_rect.y)
+        
+        # Final scene rows and their copy buttons, placed after the row labels
+        title_height = title_font.get_sized_height()
+        line_height = font.get_sized_height()
+        self.final_message_y = self.content_rect.y + title_height + 20
+        self.final_hash_y = self.final_message_y + 2 * line_height + 30
+        label_width = max(render_text(font, f"Final {name} Hash:", CONFIG["subtitle_color"])[1].width
+                          for name in (algorithm.name for algorithm in ALGORITHMS.values()))
+        copy_x = self.content_rect.x + label_width + 20
+        self.copy_msg_btn.rect.topleft = (copy_x, self.final_message_y)
+        self.copy_hash_btn.rect.topleft = (copy_x, self.final_hash_y)
+        self.tree_btn.rect.topleft = (self.content_rect.x, self.final_hash_y + 2 * line_height + 40)
+        self.hmac_btn.rect.topleft = (self.tree_btn.rect.right + button_spacing, self.tree_btn.rect.y)
+        
+        # HMAC key input below the progress bar, after its label
+        _, key_label_rect = render_text(font, "Key:", CONFIG["subtitle_color"])
+        self.hmac_key_box.rect.topleft = (self.content_rect.x + key_label_rect.width + 10, self.content_rect.y + 40)
+        self.hmac_mac_button.rect.topleft = (self.hmac_key_box.rect.right + button_spacing, self.content_rect.y + 40)
+        
+        self.layout_panes()
+        
+    def layout_panes(self):
+        """Size the bit views to the current message so every section fits above the buttons"""
+        rect = self.content_rect
+        line_height = CONFIG["font_size"] + 5
+        title_height = title_font.get_sized_height()
+        text_height = font.get_sized_height()
+        width = rect.width - 20
+        
+        # Hex bytes of the binary view start after the widest row of bits
+        bits_width = render_text(font, ' '.join(['00000000'] * 8), CONFIG["text_color"])[1].width
+        self.binary_pane.column_offsets = (0, bits_width + 30)
+        
+        # Preprocessing: message, binary, step 1 and step 2 sections stacked
+        # vertically. Rows are shared out so short sections take what they
+        # need and the rest goes to the longer ones.
+        top = rect.y + title_height + text_height + 20
+        bottom = self.prev_button.rect.top - CONFIG["padding"]
+        headers = (text_height + 5 + line_height) + (title_height + 5 + line_height) + (title_height + 20 + text_height + 10)
+        budget = max(3, (bottom - top - headers) // line_height)
+        panes = [self.binary_pane, self.append_pane, self.padded_pane]
+        rows = [0] * len(panes)
+        for count, i in enumerate(sorted(range(len(panes)), key=lambda i: panes[i].row_count)):
+            share = budget // (len(panes) - count)
+            rows[i] = max(1, min(panes[i].row_count, share))
+            budget -= rows[i]
+            
+        y = top + text_height + 5
+        self.binary_pane.rect = pygame.Rect(rect.x + 20, y, width, rows[0] * line_height)
+        y = self.binary_pane.rect.bottom + line_height + title_height + 5
+        self.append_pane.rect = pygame.Rect(rect.x + 20, y, width, rows[1] * line_height)
+        y = self.append_pane.rect.bottom + line_height + title_height + 20
+        self.padded_pane.rect = pygame.Rect(rect.x + 20, y, width, rows[2] * line_height)
+        
+        # Parsing: the current block below the block count and block title
+        y = rect.y + title_height + 10 + text_height + 20 + text_height + 5
+        self.block_pane.rect = pygame.Rect(rect.x + 20, y, width, bottom - y)
+        
+        self.widgets.rebuild_index()
+        self.invalidate()
+        
+    def set_algorithm(self, algorithm):
+        changed = algorithm is not self.current_algorithm
+        self.current_algorithm = algorithm
+        self.update_scene_descriptions()
+        # A message or file still hashing under the old algorithm would be shown under it
+        if changed and self.job is not None and self.job.kind == "hash":
+            self.cancel_job()
+        if not changed or self.walk is None:
+            return
+            
+        # The walk, blocks and traces belong to the previous algorithm; reuse
+        # a cached result of the same message under the new one if there is one
+        cached = None
+        if self.source_path is None:
+            cached = self.result_cache.get(message_key(algorithm, self.message.encode('utf-8')))
+        if cached is not None:
+            self.show_result(*cached)
+        else:
+            self.message = ""
+            self.source_path = None
+            self.walk = None
+            self.blocks = []
+            self.final_hash = ""
+        # The radio buttons live on the intro scene; Next starts the walk from there
+        self.current_scene = "intro"
+        self.step_index = 0
+        
+    def update_scene_descriptions(self):
+        self.scenes = {
+            "intro": {"title": f"{self.current_algorithm.name} Hash Algorithm", 
+                     "description": f"Enter a message to visualize the {self.current_algorithm.name} hashing process."},
+            "preprocessing": {"title": "Step 1: Preprocessing", 
+                             "description": "Convert the message to binary and pad it."},
+            "parsing": {"title": "Step 2: Parsing", 
+                       "description": f"Break the padded message into {self.current_algorithm.block_size}-bit blocks."},
+            "initialize": {"title": "Step 3: Initialize Hash Values", 
+                          "description": "Set up the initial hash values (H0-H7)."},
+            "prepare_schedule": {"title": "Step 4: Prepare Message Schedule", 
+                                "description": f"Expand the block into {self.current_algorithm.rounds} words."},
+            "compression": {"title": "Step 5: Compression Function", 
+                           "description": "Process the block through the compression function."},
+            "final": {"title": "Final Hash Value", 
+                     "description": f"The resulting {self.current_algorithm.name} hash."},
+            "tree": {"title": "Tree Hash",
+                    "description": "Leaves hashed independently and combined pairwise into a Merkle tree."},
+            "hmac": {"title": "HMAC",
+                    "description": "The message hashed under a key in two nested passes."}
+        }
+        
+    def start_hash(self):
+        message = self.text_box.text
+        if not message:
+            return
+        self.cancel_job()
+        
+        # Pick the message up from the cache if it was hashed before
+        data = message.encode('utf-8')
+        key = message_key(self.current_algorithm, data)
+        cached = self.result_cache.get(key)
+        if cached is not None:
+            self.message = message
+            self.source_path = None
+            self.show_result(*cached)
+            return
+            
+        job = Job("Hashing message", len(data))
+        job.kind = "hash"
+        job.path = None
+        job.text = message
+        if len(data) > CONFIG["background_hash_bytes"]:
+            self.start_job(job, data, key)
+            return
+            
+        # Short messages hash within a frame, so there is nothing to wait for
+        job.algorithm = self.current_algorithm
+        job.cache_key = key
+        job.at_end = False
+        job.future = Future()
+        job.future.set_result(hash_job(job, self.current_algorithm, data))
+        self.job = job
+        self.finish_job(job)
+        
+    def show_result(self, result, walk, at_end=False):
+        """Visualize a process_message() style result, at its first or last block"""
+        (self.final_hash, self.binary_message, self.padded_message, self.blocks), self.walk = result, walk
+        self.binary_pane.set_rows(*bit_rows(self.binary_message, show_hex=True))
+        self.append_pane.set_rows(*bit_rows(self.binary_message, "1"))
+        self.padded_pane.set_rows(*bit_rows(self.padded_message))
+        self.layout_panes()
+        
+        # Initialize visualization state
+        self.current_scene = "preprocessing"
+        self.step_index = 0
+        self.current_block_index = 0
+        self.schedule = None  # Will be initialized when needed
+        self.trace = None
+        if at_end:
+            self.load_block(len(self.blocks) - 1)
+            self.current_scene = "prepare_schedule"
+        else:
+            self.load_block(0)
+        print(f"Initialized schedule with {len(self.schedule)} words")
+        
+        # Update scene descriptions
+        self.update_scene_descriptions()
+        
+    def open_file(self, path, at_end=None):
+        """Hash a file in the background; the visualization opens once it is done"""
+        if at_end is None:
+            at_end = CONFIG["open_file_at"] == "last"
+        self.cancel_job()
+        self.current_scene = "intro"
+        try:
+            size = os.path.getsize(path)
+        except OSError as e:
+            self.progress_bar.show_message(f"{os.path.basename(path)}: {e.strerror}")
+            return
+        job = Job(f"Hashing {os.path.basename(path)}", size)
+        job.kind = "hash"
+        job.path = path
+        job.text = None
+        # Traces of a file stay valid until it is modified
+        cache_key = (self.current_algorithm.name, os.path.abspath(path), size, os.path.getmtime(path))
+        self.start_job(job, None, cache_key, at_end)
+        
+    def start_job(self, job, data, cache_key, at_end=False):
+        """Hash data (or the file at job.path) in the background with the current algorithm"""
+        job.algorithm = self.current_algorithm
+        job.cache_key = cache_key
+        job.at_end = at_end
+        self.job = job
+        self.progress_bar.track(job)
+        self.jobs.submit(job, hash_job, self.current_algorithm, data, at_end)
+        
+    def open_file_dialog(self):
+        # Shift while clicking opens the file at its last block
+        at_end = (CONFIG["open_file_at"] == "last") != bool(pygame.key.get_mods() & pygame.KMOD_SHIFT)
+        try:
+            import tkinter
+            from tkinter import filedialog
+            root = tkinter.Tk()
+            root.withdraw()
+            path = filedialog.askopenfilename(title="Open a file to hash")
+            root.destroy()
+        except Exception:
+            # No Tk on this system; dropping files onto the window still works
+            self.progress_bar.show_message("No file dialog available: drop a file onto the window instead")
+            return
+        if path:
+            self.open_file(path, at_end)
+            
+    def cancel_job(self):
+        if self.job is not None:
+            self.job.cancel()
+            self.job = None
+            self.progress_bar.show_message("Cancelled")
+            
+    def show_tree(self):
+        """Switch to the Merkle tree of the current message, hashing its leaves first if needed"""
+        leaf_size = CONFIG["tree_leaf_bytes"] if self.source_path else CONFIG["tree_message_leaf_bytes"]
+        key = (self.current_algorithm.name, self.final_hash, leaf_size)
+        self.current_scene = "tree"
+        self.step_index = 0
+        if key == self.tree_key:
+            return
+        self.cancel_job()
+        self.tree_levels = None
+        self.tree_key = None
+        
+        data = self.blocks.data
+        job = Job("Hashing tree leaves", len(data))
+        job.kind = "tree"
+        job.path = None
+        job.text = None
+        job.tree_key = key
+        job.leaf_size = leaf_size
+        self.job = job
+        if len(data) > CONFIG["background_hash_bytes"]:
+            self.progress_bar.track(job)
+            self.jobs.submit(job, tree_job, self.current_algorithm, data, leaf_size)
+            return
+        job.future = Future()
+        job.future.set_result(tree_job(job, self.current_algorithm, data, leaf_size))
+        self.finish_job(job)
+        
+    def finish_tree_job(self, job):
+        try:
+            levels = job.result()
+        except JobCancelled:
+            self.progress_bar.show_message("Cancelled")
+            return
+        if job.total > CONFIG["background_hash_bytes"]:
+            self.progress_bar.show_message(f"{len(levels[0]):,} leaves at {job.rate() / 1e6:.2f} MB/s")
+        else:
+            self.progress_bar.show_message("")
+        self.tree_levels = levels
+        self.tree_key = job.tree_key
+        self.tree_leaf_size = job.leaf_size
+        
+    def show_hmac(self):
+        """Switch to the HMAC of the current message, computing it first if needed"""
+        self.current_scene = "hmac"
+        self.step_index = 0
+        self.start_hmac()
+        
+    def start_hmac(self):
+        """MAC the current message under the key in the key box, unless that is already shown"""
+        key = self.hmac_key_box.text.encode("utf-8")
+        state = (self.current_algorithm.name, self.final_hash, key)
+        if state == self.hmac_state:
+            return
+        self.cancel_job()
+        self.hmac_digests = None
+        self.hmac_state = None
+        # Pads are compressed here, once per key; the job only hashes the message
+        self.hmac_key = hmac_key(self.current_algorithm, key)
+        
+        data = self.blocks.data
+        job = Job("Computing HMAC", len(data))
+        job.kind = "hmac"
+        job.path = None
+        job.text = None
+        job.hmac_state = state
+        self.job = job
+        if len(data) > CONFIG["background_hash_bytes"]:
+            self.progress_bar.track(job)
+            self.jobs.submit(job, hmac_job, self.hmac_key, data)
+            return
+        job.future = Future()
+        job.future.set_result(hmac_job(job, self.hmac_key, data))
+        self.finish_job(job)
+        
+    def finish_hmac_job(self, job):
+        try:
+            digests = job.result()
+        except JobCancelled:
+            self.progress_bar.show_message("Cancelled")
+            return
+        if job.total > CONFIG["background_hash_bytes"]:
+            self.progress_bar.show_message(f"HMAC of {job.total:,} bytes at {job.rate() / 1e6:.2f} MB/s")
+        else:
+            self.progress_bar.show_message("")
+        self.hmac_digests = digests
+        self.hmac_state = job.hmac_state
+        
+    def finish_job(self, job):
+        """Handle JOB_DONE: show the hashed message or file, unless the job was replaced or cancelled"""
+        if job is not self.job:
+            return
+        self.job = None
+        self.hud.job_finished(job)
+        if job.kind == "tree":
+            self.finish_tree_job(job)
+            return
+        if job.kind == "hmac":
+            self.finish_hmac_job(job)
+            return
+        name = os.path.basename(job.path) if job.path else "message"
+        try:
+            data, digest, walk = job.result()
+        except JobCancelled:
+            self.progress_bar.show_message("Cancelled")
+            return
+        except OSError as e:
+            self.progress_bar.show_message(f"{name}: {e.strerror}")
+            return
+            
+        if job.total > CONFIG["background_hash_bytes"]:
+            self.progress_bar.show_message(f"{name}: {job.total:,} bytes at {job.rate() / 1e6:.2f} MB/s")
+        else:
+            self.progress_bar.show_message("")
+            
+        # The worker traced the opening block privately; the cache belongs to this thread
+        walk.share_traces(self.trace_cache, job.cache_key)
+        
+        # Blocks and bit views are windows onto the message or mapped file, so nothing is copied
+        blocks = walk.blocks
+        result = (digest, BitView(data), blocks.padded_bits(), blocks)
+        if job.path is None:
+            size = len(data) + len(blocks) * RESULT_BYTES_PER_BLOCK
+            self.result_cache.put(job.cache_key, (result, walk), size)
+        self.message = job.text if job.path is None else name
+        self.source_path = job.path
+        self.show_result(result, walk, at_end=job.at_end)
+        
+    def load_block(self, index):
+        """Make block index current, carrying over the chaining values from earlier blocks"""
+        self.current_block_index = index
+        self.previous_hash_values = list(self.walk.chaining_values(index))
+        self.hash_values = list(self.previous_hash_values)
+        
+        # Trace every round of the block in one pass; the schedule and
+        # compression scenes only index into it
+        self.trace = self.walk.trace(index)
+        self.schedule = self.trace.schedule
+        self.block_pane.set_rows(*bit_rows(BitView(self.blocks[index])))
+        
+        # Block navigation only makes sense with more than one block
+        for button in (self.prev_block_button, self.next_block_button):
+            button.visible = len(self.blocks) > 1
+            button.needs_redraw = True
+        self.prev_block_button.active = index > 0
+        self.next_block_button.active = index + 1 < len(self.blocks)
+        
+    def go_to_block(self, index):
+        if self.walk and 0 <= index < len(self.walk):
+            self.load_block(index)
+            
+    def reset(self):
+        self.current_scene = "intro"
+        self.step_index = 0
+        self.sub_step_index = 0
+        self.update_scene_descriptions()
+        
+    def next_step(self):
+        if self.current_scene == "intro":
+            if self.message:
+                self.current_scene = "preprocessing"
+        elif self.current_scene == "preprocessing":
+            self.step_index += 1
+            if self.step_index > 2:  # After padding steps
+                self.step_index = 0
+                self.current_scene = "parsing"
+        elif self.current_scene == "parsing":
+            self.step_index += 1
+            if self.step_index > 0:  # After showing blocks
+                self.step_index = 0
+                self.current_scene = "initialize"
+        elif self.current_scene == "initialize":
+            self.step_index += 1
+            if self.step_index > 7:  # After showing all hash values
+                self.step_index = 0
+                self.current_scene = "prepare_schedule"
+        elif self.current_scene == "prepare_schedule":
+            self.step_index += 1
+            if self.step_index > 3:  # After showing all schedule words
+                self.step_index = 0
+                self.current_scene = "compression"
+        elif self.current_scene == "compression":
+            self.step_index += 1
+            if self.step_index >= self.current_algorithm.rounds:  # After all compression rounds
+                self.step_index = 0
+                if self.current_block_index + 1 < len(self.blocks):
+                    # Continue with the next block's message schedule
+                    self.load_block(self.current_block_index + 1)
+                    self.current_scene = "prepare_schedule"
+                else:
+                    self.current_scene = "final"
+        elif self.current_scene == "final":
+            self.show_tree()
+        elif self.current_scene == "tree":
+            # Page through the leaves
+            if self.tree_levels and (self.step_index + 1) * self.tree_leaves_per_page() < len(self.tree_levels[0]):
+                self.step_index += 1
+                
+    def previous_step(self):
+        if self.current_scene == "preprocessing":
+            if self.step_index > 0:
+                self.step_index -= 1
+            else:
+                self.current_scene = "intro"
+        elif self.current_scene == "parsing":
+            if self.step_index > 0:
+                self.step_index -= 1
+            else:
+                self.current_scene = "preprocessing"
+                self.step_index = 2
+        elif self.current_scene == "initialize":
+            if self.step_index > 0:
+                self.step_index -= 1
+            else:
+                self.current_scene = "parsing"
+                self.step_index = 0
+        elif self.current_scene == "prepare_schedule":
+            if self.step_index > 0:
+                self.step_index -= 1
+            elif self.current_block_index > 0:
+                # Back to the last round of the previous block
+                self.load_block(self.current_block_index - 1)
+                self.current_scene = "compression"
+                self.step_index = self.current_algorithm.rounds - 1
+            else:
+                self.current_scene = "initialize"
+                self.step_index = 7
+        elif self.current_scene == "compression":
+            if self.step_index > 0:
+                self.step_index -= 1
+            else:
+                self.current_scene = "prepare_schedule"
+                self.step_index = 3
+        elif self.current_scene == "final":
+            self.load_block(len(self.blocks) - 1)
+            self.current_scene = "compression"
+            self.step_index = self.current_algorithm.rounds - 1
+        elif self.current_scene == "tree":
+            if self.step_index > 0:
+                self.step_index -= 1
+            else:
+                self.current_scene = "final"
+        elif self.current_scene == "hmac":
+            self.current_scene = "final"
+            
+    def update(self, dt: float):
+        # Editing the message makes a running hash of it pointless
+        if self.job is not None and self.job.text is not None and self.job.text != self.text_box.text:
+            self.cancel_job()
+        self.animation_time += dt
+        self.text_box.update(dt)
+        self.progress_bar.update(dt)
+        
+    def layer_key(self):
+        """Everything the static scene layer depends on"""
+        return (self.current_scene, self.step_index, self.current_block_index,
+                self.current_algorithm.name, self.message, self.final_hash, self.tree_key, self.hmac_state)
+                
+    def visible_widgets(self):
+        """Widgets drawn on top of the current scene's static layer"""
+        return [widget for widget in self.widgets.widgets_for(self.current_scene) if widget.visible]
+        
+    def invalidate(self):
+        """Force the whole window to be redrawn on the next draw()"""
+        self.scene_layer_key = None
+        
+    def needs_redraw(self):
+        # The overlay shows live timings, so it keeps frames coming
+        return (self.hud.visible or self.layer_key() != self.scene_layer_key or
+                any(widget.needs_redraw for widget in self.visible_widgets()))
+                
+    def toggle_hud(self):
+        self.hud.visible = not self.hud.visible
+        self.hud.frames.clear()
+        self.invalidate()
+        
+    def draw(self, surface: pygame.Surface):
+        """Redraw whatever changed since the last call and return the dirty rects"""
+        if (self.scene_layer_key != self.layer_key() or self.scene_layer is None or
+                self.scene_layer.get_size() != surface.get_size()):
+            # The scene itself changed: rebuild its static layer
+            if self.scene_layer is None or self.scene_layer.get_size() != surface.get_size():
+                self.scene_layer = pygame.Surface(surface.get_size())
+            self.draw_scene_layer(self.scene_layer)
+            self.scene_layer_key = self.layer_key()
+            
+            surface.blit(self.scene_layer, (0, 0))
+            for widget in self.visible_widgets():
+                widget.draw(surface)
+                widget.needs_redraw = False
+            if self.hud.visible:
+                self.hud.draw(surface, self)
+            return [surface.get_rect()]
+            
+        # Only widgets changed (hover, typing, cursor blink): repaint their areas
+        dirty_rects = []
+        for widget in self.visible_widgets():
+            if widget.needs_redraw:
+                surface.blit(self.scene_layer, widget.rect, widget.rect)
+                widget.draw(surface)
+                widget.needs_redraw = False
+                dirty_rects.append(pygame.Rect(widget.rect))
+                
+        # Repaint the overlay with whatever lies under it
+        if self.hud.visible:
+            surface.blit(self.scene_layer, self.hud.rect, self.hud.rect)
+            for widget in self.visible_widgets():
+                if widget.rect.colliderect(self.hud.rect):
+                    widget.draw(surface)
+            self.hud.draw(surface, self)
+            dirty_rects.append(pygame.Rect(self.hud.rect))
+        return dirty_rects
+        
+    def draw_scene_layer(self, surface: pygame.Surface):
+        # Clear screen
+        surface.fill(CONFIG["bg_color"])
+        
+        # Draw title and description
+        if self.current_scene in self.scenes:
+            scene_info = self.scenes[self.current_scene]
+            # Include algorithm name in title for all scenes except intro
+            if self.current_scene != "intro":
+                title = f"{self.current_algorithm.name} - {scene_info['title']}"
+            else:
+                title = scene_info["title"]
+                
+            title_surf, title_rect = render_text(title_font, title, CONFIG["highlight_color"])
+            surface.blit(title_surf, (CONFIG["padding"], CONFIG["padding"] * 3))
+            
+            desc_surf, desc_rect = render_text(font, scene_info["description"], CONFIG["text_color"])
+            surface.blit(desc_surf, (CONFIG["padding"], CONFIG["padding"] * 3 + title_rect.height + 10))
+            
+        # Draw content based on current scene
+        content_rect = self.content_rect
+        
+        if self.current_scene == "preprocessing":
+            self.draw_preprocessing(surface, content_rect)
+        elif self.current_scene == "parsing":
+            self.draw_parsing(surface, content_rect)
+        elif self.current_scene == "initialize":
+            self.draw_initialize(surface, content_rect)
+        elif self.current_scene == "prepare_schedule":
+            self.draw_prepare_schedule(surface, content_rect)
+        elif self.current_scene == "compression":
+            self.draw_compression(surface, content_rect)
+        elif self.current_scene == "final":
+            self.draw_final(surface, content_rect)
+        elif self.current_scene == "tree":
+            self.draw_tree(surface, content_rect)
+        elif self.current_scene == "hmac":
+            self.draw_hmac(surface, content_rect)
+            
+        # Draw block navigation in the scenes that work on a single block
+        if self.shows_block_navigation():
+            block_text = f"Block {self.current_block_index + 1}/{len(self.blocks)}"
+            block_surf, block_rect = render_text(font, block_text, CONFIG["subtitle_color"])
+            surface.blit(block_surf, (self.prev_block_button.rect.x - block_rect.width - 15,
+                                      self.prev_block_button.rect.centery - block_rect.height // 2))
+                                      
+        # Navigation buttons are widgets; only the explanation belongs to the layer
+        if self.current_scene != "intro":
+            # Draw explanation text with configurable position
+            if hasattr(self, 'current_explanation') and self.current_explanation:
+                # Use the dedicated explanation font
+                explanation_surf, explanation_rect = render_text(explanation_font, 
+                    self.current_explanation, 
+                    CONFIG["explanation_text_color"]
+                )
+                
+                # Determine position based on configuration
+                if CONFIG["explanation_position"] == "bottom":
+                    # Position between prev/next and reset buttons at bottom
+                    explanation_x = self.prev_button.rect.right + CONFIG["explanation_x_offset"]
+                    explanation_width = self.reset_button.rect.left - explanation_x - CONFIG["explanation_x_offset"]
+                    explanation_y = CONFIG["height"] - CONFIG["padding"] - explanation_rect.height + CONFIG["explanation_y_offset"]
+                elif CONFIG["explanation_position"] == "top":
+                    # Position at top of screen below title
+                    explanation_x = CONFIG["padding"]
+                    explanation_width = CONFIG["width"] - 2 * CONFIG["padding"]
+                    explanation_y = CONFIG["padding"] * 3 + 60 + CONFIG["explanation_y_offset"]
+                else:  # "custom"
+                    # Use custom position
+                    explanation_x = CONFIG["explanation_custom_x"]
+                    explanation_width = CONFIG["explanation_max_width"]
+                    explanation_y = CONFIG["explanation_custom_y"]
+                    
+                # If text is too wide, wrap it
+                if explanation_rect.width > explanation_width:
+                    # Split into multiple lines if needed
+                    words = self.current_explanation.split()
+                    lines = []
+                    current_line = []
+                    
+                    for word in words:
+                        test_line = ' '.join(current_line + [word])
+                        test_surf, test_rect = render_text(explanation_font, test_line, CONFIG["explanation_text_color"])
+                        
+                        if test_rect.width <= explanation_width:
+                            current_line.append(word)
+                        else:
+                            lines.append(' '.join(current_line))
+                            current_line = [word]
+                            
+                    if current_line:
+                        lines.append(' '.join(current_line))
+                        
+                    # Draw each line
+                    line_height = CONFIG["explanation_font_size"] + 2
+                    bg_height = len(lines) * line_height + 2 * CONFIG["explanation_padding"]
+                    
+                    # Draw background
+                    pygame.draw.rect(surface, CONFIG["explanation_bg_color"], 
+                                   (explanation_x - CONFIG["explanation_padding"], 
+                                    explanation_y - CONFIG["explanation_padding"] - (len(lines) - 1) * line_height, 
+                                    min(explanation_width, CONFIG["explanation_max_width"]) + 2 * CONFIG["explanation_padding"], 
+                                    bg_height),
+                                   border_radius=5)
+                                   
+                    # Draw text lines
+                    for i, line in enumerate(lines):
+                        line_surf, line_rect = render_text(explanation_font, line, CONFIG["explanation_text_color"])
+                        surface.blit(line_surf, 
+                                   (explanation_x, 
+                                    explanation_y - (len(lines) - 1 - i) * line_height))
+                else:
+                    # Draw background
+                    pygame.draw.rect(surface, CONFIG["explanation_bg_color"], 
+                                   (explanation_x - CONFIG["explanation_padding"], 
+                                    explanation_y - CONFIG["explanation_padding"], 
+                                    explanation_rect.width + 2 * CONFIG["explanation_padding"], 
+                                    explanation_rect.height + 2 * CONFIG["explanation_padding"]),
+                                   border_radius=5)
+                                   
+                    # Draw text
+                    surface.blit(explanation_surf, (explanation_x, explanation_y))
+                    
+    def shows_block_navigation(self):
+        return self.current_scene in ("parsing", "prepare_schedule", "compression") and len(self.blocks) > 1
+        
+    def draw_preprocessing(self, surface: pygame.Surface, rect: pygame.Rect):
+        # Draw original message
+        msg_title_surf, msg_title_rect = render_text(title_font, "Original Message:", CONFIG["subtitle_color"])
+        surface.blit(msg_title_surf, (rect.x, rect.y))
+        
+        # If message is too long, truncate with ellipsis
+        msg_surf, msg_rect = preview_text(self.message, font, rect.width - 40)
+        surface.blit(msg_surf, (rect.x, rect.y + msg_title_rect.height + 5))
+        
+        # The bit rows themselves are scroll pane widgets placed by layout_panes();
+        # the layer only holds their titles
+        self.binary_pane.visible = self.step_index >= 0
+        self.append_pane.visible = self.step_index >= 1
+        self.padded_pane.visible = self.step_index >= 2
+        
+        if self.step_index >= 0:
+            bin_title_surf, bin_title_rect = render_text(font, "Binary Representation:", CONFIG["subtitle_color"])
+            surface.blit(bin_title_surf, (rect.x, self.binary_pane.rect.y - font.get_sized_height() - 5))
+            
+        # Draw padding step 1 (append 1)
+        if self.step_index >= 1:
+            pad1_title_surf, pad1_title_rect = render_text(title_font, "Step 1: Append '1' bit", CONFIG["subtitle_color"])
+            surface.blit(pad1_title_surf, (rect.x, self.append_pane.rect.y - title_font.get_sized_height() - 5))
+            
+        # Draw padding step 2 (append 0s and length)
+        if self.step_index >= 2:
+            pad2_title_surf, pad2_title_rect = render_text(title_font, "Step 2: Pad with '0's and append original length", CONFIG["subtitle_color"])
+            surface.blit(pad2_title_surf, (rect.x, self.padded_pane.rect.y - title_font.get_sized_height() - 20))
+            
+            # Show padded message length
+            length_text = f"Final padded length: {len(self.padded_message)} bits"
+            length_surf, length_rect = render_text(font, length_text, CONFIG["text_color"])
+            surface.blit(length_surf, (rect.x, self.padded_pane.rect.bottom + 10))
+            
+        # Set explanation based on step
+        if self.step_index == 0:
+            shown = self.message if len(self.message) <= 30 else self.message[:30] + "..."
+            if self.source_path:
+                self.current_explanation = f"Reading the {len(self.binary_message) // 8:,} bytes of '{shown}'"
+            else:
+                self.current_explanation = f"Converting '{shown}' to binary: {len(self.binary_message) // 8} bytes of UTF-8"
+        elif self.step_index == 1:
+            self.current_explanation = f"Appending '1' bit to the end of the binary message"
+        elif self.step_index == 2:
+            algorithm = self.current_algorithm
+            self.current_explanation = (f"Padding with '0's until message length ≡ {algorithm.padding_offset} "
+                                        f"(mod {algorithm.block_size}), then appending {algorithm.length_size}-bit message length")
+                                        
+    def draw_parsing(self, surface: pygame.Surface, rect: pygame.Rect):
+        title_surf, title_rect = render_text(title_font, f"Parsing into {self.current_algorithm.block_size}-bit Blocks:", CONFIG["subtitle_color"])
+        surface.blit(title_surf, (rect.x, rect.y))
+        
+        y_offset = rect.y + title_rect.height + 10
+        
+        # Show number of blocks
+        num_blocks_text = f"Number of blocks: {len(self.blocks)}"
+        num_blocks_surf, num_blocks_rect = render_text(font, num_blocks_text, CONFIG["text_color"])
+        surface.blit(num_blocks_surf, (rect.x, y_offset))
+        
+        y_offset += num_blocks_rect.height + 20
+        
+        # Show current block
+        if self.blocks:
+            block_title = f"Block {self.current_block_index + 1} of {len(self.blocks)}:"
+            block_title_surf, block_title_rect = render_text(font, block_title, CONFIG["subtitle_color"])
+            surface.blit(block_title_surf, (rect.x, y_offset))
+            
+            # The block's bits are drawn by block_pane
+            
+        # Set explanation
+        self.current_explanation = f"Breaking the padded message into {self.current_algorithm.block_size}-bit blocks for processing"
+        
+    def draw_initialize(self, surface: pygame.Surface, rect: pygame.Rect):
+        title_surf, title_rect = render_text(title_font, "Initialize Hash Values:", CONFIG["subtitle_color"])
+        surface.blit(title_surf, (rect.x, rect.y))
+        
+        # Show explanation
+        explanation = INIT_VALUE_SOURCES[self.current_algorithm.name]
+        
+        explanation_surf, explanation_rect = render_text(font, explanation, CONFIG["text_color"])
+        surface.blit(explanation_surf, (rect.x, rect.y + title_rect.height + 5))
+        
+        # Show hash values
+        y_offset = rect.y + title_rect.height + explanation_rect.height + 20
+        for i, value in enumerate(self.current_algorithm.init_values):
+            # Format based on algorithm
+            format_width = self.current_algorithm.word_size // 4
+            text = f"H{i} = {format(value, f'0{format_width}x')}"
+            value_surf, value_rect = render_text(font, text, CONFIG["text_color"])
+            
+            # Highlight current value
+            if i == self.step_index:
+                pygame.draw.rect(surface, CONFIG["highlight_color"], 
+                               (rect.x + 15, y_offset - 2, value_rect.width + 10, value_rect.height + 4))
+                               
+            surface.blit(value_surf, (rect.x + 20, y_offset))
+            y_offset += value_rect.height + 5
+            
+        # Set explanation based on step
+        if self.step_index <= 7:
+            self.current_explanation = f"Initializing hash value H{self.step_index} with its {self.current_algorithm.name} constant"
+            
+    def draw_prepare_schedule(self, surface: pygame.Surface, rect: pygame.Rect):
+        title_surf, title_rect = render_text(title_font, "Message Schedule Words:", CONFIG["highlight_color"])
+        surface.blit(title_surf, (rect.x, rect.y))
+        
+        # Add explanation based on step and algorithm
+        if self.current_algorithm.rounds == 64:
+            if self.step_index == 0:
+                self.current_explanation = "First 16 words (W0-W15) are taken directly from the 512-bit message block"
+                end_idx = 16
+            elif self.step_index == 1:
+                self.current_explanation = "Words W16-W31 are calculated using: W[i] = W[i-16] + s0 + W[i-7] + s1, where s0 and s1 are rotation functions"
+                end_idx = 32
+            elif self.step_index == 2:
+                self.current_explanation = "Words W32-W47 continue the expansion pattern using the same formula"
+                end_idx = 48
+            else:
+                self.current_explanation = "Words W48-W63 complete the message schedule using the same formula"
+                end_idx = 64
+        else:  # 80 rounds of SHA-512 and its variants
+            if self.step_index == 0:
+                self.current_explanation = "First 16 words (W0-W15) are taken directly from the 1024-bit message block"
+                end_idx = 16
+            elif self.step_index == 1:
+                self.current_explanation = "Words W16-W31 are calculated using: W[i] = W[i-16] + s0 + W[i-7] + s1, where s0 and s1 are rotation functions"
+                end_idx = 32
+            elif self.step_index == 2:
+                self.current_explanation = "Words W32-W63 continue the expansion pattern using the same formula"
+                end_idx = 64
+            else:
+                self.current_explanation = "Words W64-W79 complete the message schedule using the same formula"
+                end_idx = 80
+                
+        explanation_surf, explanation_rect = render_text(font, self.current_explanation, CONFIG["text_color"])
+        surface.blit(explanation_surf, (rect.x, rect.y + title_rect.height + 5))
+        
+        y_offset = rect.y + title_rect.height + explanation_rect.height + 15
+        words_per_line = 4  # Always show 4 words per line
+        
+        # Use same spacing for both algorithms to prevent overlap
+        word_width = 200  # Increased width for both SHA-256 and SHA-512
+        
+        # Check if schedule exists and has enough elements
+        if not hasattr(self, 'schedule') or not self.schedule:
+            # Prepare the schedule if it doesn't exist
+            if self.blocks:
+                current_block = self.blocks[self.current_block_index]
+                self.schedule = self.current_algorithm.prepare_message_schedule(current_block)
+                
+        # Debug output
+        if self.schedule:
+            print(f"Schedule length: {len(self.schedule)}, end_idx: {end_idx}")
+            
+        # Draw all words up to current step, but only if they exist in the schedule
+        if self.schedule:
+            for i in range(0, min(end_idx, len(self.schedule))):
+                x = rect.x + (i % words_per_line) * word_width
+                y = y_offset + (i // words_per_line) * (CONFIG["font_size"] + 10)  # Add more vertical spacing
+                
+                # Format based on algorithm
+                format_width = self.current_algorithm.word_size // 4
+                text = f"W{i:2d} = {format(self.schedule[i], f'0{format_width}x')}"
+                word_surf, word_rect = render_text(font, text, CONFIG["text_color"])
+                
+                # Highlight new words for current step
+                if (self.current_algorithm.rounds == 64 and 
+                    ((16 <= i < 32 and self.step_index == 1) or 
+                     (32 <= i < 48 and self.step_index == 2) or 
+                     (48 <= i < 64 and self.step_index == 3))) or \
+                   (self.current_algorithm.rounds == 80 and 
+                    ((16 <= i < 32 and self.step_index == 1) or 
+                     (32 <= i < 64 and self.step_index == 2) or 
+                     (64 <= i < 80 and self.step_index == 3))):
+                    pygame.draw.rect(surface, CONFIG["highlight_color"], 
+                                   (x - 2, y - 2, word_rect.width + 4, word_rect.height + 4))
+                                   
+                surface.blit(word_surf, (x, y))
+                
+    def draw_compression(self, surface: pygame.Surface, rect: pygame.Rect):
+        title_surf, title_rect = render_text(title_font, f"Compression Function (Round {self.step_index + 1}/{self.current_algorithm.rounds}):", CONFIG["subtitle_color"])
+        surface.blit(title_surf, (rect.x, rect.y))
+        
+        # Working variables after this round come straight from the trace
+        working_values = self.trace.state(self.step_index)
+        
+        # Draw working variables
+        y_offset = rect.y + title_rect.height + 10
+        variables = ['a', 'b', 'c', 'd', 'e', 'f', 'g', 'h']
+        format_width = self.current_algorithm.word_size // 4
+        
+        for i, var in enumerate(variables):
+            value = working_values[i]
+            text = f"{var} = {format(value, f'0{format_width}x')}"
+            var_surf, var_rect = render_text(font, text, CONFIG["text_color"])
+            surface.blit(var_surf, (rect.x + 20, y_offset))
+            y_offset += var_rect.height + 5
+            
+        # Draw current round details
+        round_y = y_offset + 20
+        round_text = f"Round {self.step_index + 1}: Using message schedule word W{self.step_index} = {format(self.schedule[self.step_index], f'0{format_width}x')}"
+        round_surf, round_rect = render_text(font, round_text, CONFIG["subtitle_color"])
+        surface.blit(round_surf, (rect.x, round_y))
+        
+        # Draw K constant
+        k_y = round_y + round_rect.height + 5
+        k_text = f"K{self.step_index} = {format(self.current_algorithm.k_values[self.step_index], f'0{format_width}x')}"
+        k_surf, k_rect = render_text(font, k_text, CONFIG["text_color"])
+        surface.blit(k_surf, (rect.x + 20, k_y))
+        
+        # Draw the chaining values this block starts from, and at the last
+        # round the values it hands on to the next block
+        chain_x = rect.x + 500
+        chain_y = rect.y + title_rect.height + 10
+        last_round = self.step_index == self.current_algorithm.rounds - 1
+        chain_title = "Hash values after this block:" if last_round else "Hash values before this block:"
+        chain_title_surf, chain_title_rect = render_text(font, chain_title, CONFIG["subtitle_color"])
+        surface.blit(chain_title_surf, (chain_x, chain_y))
+        chain_y += chain_title_rect.height + 5
+        for i, value in enumerate(self.previous_hash_values):
+            text = f"H{i} = {format(value, f'0{format_width}x')}"
+            if last_round:
+                text += f" + {variables[i]} = {format(self.trace.hash_values[i], f'0{format_width}x')}"
+            chain_surf, chain_rect = render_text(font, text, CONFIG["text_color"])
+            surface.blit(chain_surf, (chain_x + 20, chain_y))
+            chain_y += chain_rect.height + 5
+            
+        # Draw the intermediate values of this round
+        values = self.trace.intermediates(self.step_index)
+        detail_y = k_y + k_rect.height + 5
+        for names in (("S1", "Ch", "T1"), ("S0", "Maj", "T2")):
+            detail_text = "   ".join(f"{name} = {format(values[name], f'0{format_width}x')}" for name in names)
+            detail_surf, detail_rect = render_text(font, detail_text, CONFIG["text_color"])
+            surface.blit(detail_surf, (rect.x + 20, detail_y))
+            detail_y += detail_rect.height + 5
+            
+        # Set explanation based on step
+        round_text = f"Round {self.step_index + 1}/{self.current_algorithm.rounds}"
+        self.current_explanation = f"{round_text}: Applying compression function to update working variables a-h using message schedule word W{self.step_index}"
+        
+    def draw_final(self, surface: pygame.Surface, rect: pygame.Rect):
+        # Show algorithm used
+        algo_title_surf, algo_title_rect = render_text(title_font, f"Algorithm: {self.current_algorithm.name}", CONFIG["highlight_color"])
+        surface.blit(algo_title_surf, (rect.x, rect.y))
+        
+        # Show input message; its copy button sits next to the label (see layout())
+        msg_y = self.final_message_y
+        msg_title_surf, msg_title_rect = render_text(font, "Input Message:", CONFIG["subtitle_color"])
+        surface.blit(msg_title_surf, (rect.x, msg_y))
+        
+        msg_surf, msg_rect = preview_text(self.message, font, rect.width - 40, limit=80)
+        surface.blit(msg_surf, (rect.x + 20, msg_y + font.get_sized_height() + 5))
+        
+        # Show final hash with copy button
+        hash_y = self.final_hash_y
+        hash_title_surf, hash_title_rect = render_text(font, f"Final {self.current_algorithm.name} Hash:", CONFIG["subtitle_color"])
+        surface.blit(hash_title_surf, (rect.x, hash_y))
+        
+        hash_surf, hash_rect = render_text(font, self.final_hash, CONFIG["text_color"])
+        surface.blit(hash_surf, (rect.x + 20, hash_y + font.get_sized_height() + 5))
+        
+        # Set explanation
+        algorithm = self.current_algorithm
+        self.current_explanation = f"Final {algorithm.name} hash value: {self.final_hash}"
+        if algorithm.digest_bits < 8 * algorithm.word_size:
+            self.current_explanation = f"H0-H7 truncated to the first {algorithm.digest_bits} bits: {self.final_hash}"
+            
+    def tree_leaves_per_page(self):
+        return max(1, self.content_rect.width // CONFIG["tree_node_width"])
+        
+    def draw_tree(self, surface: pygame.Surface, rect: pygame.Rect):
+        # The progress bar sits at the top while the leaves are hashed
+        y = rect.y + self.progress_bar.rect.height + 10
+        if self.tree_levels is None:
+            waiting_surf, _ = render_text(font, "Hashing the leaves...", CONFIG["text_color"])
+            surface.blit(waiting_surf, (rect.x, y))
+            self.current_explanation = "Every leaf is hashed on its own, so main.py hash --tree spreads a file over all cores"
+            return
+            
+        levels = self.tree_levels
+        leaf_total = len(levels[0])
+        root_text = format_tree_digest(self.current_algorithm, self.tree_leaf_size, levels[-1][0])
+        root_surf, root_rect = render_text(small_font, f"Root: {root_text}", CONFIG["subtitle_color"])
+        surface.blit(root_surf, (rect.x, y))
+        y += root_rect.height + 20
+        
+        # One page of leaves across the bottom row; a node at height h covers
+        # leaves i << h up to (i + 1) << h, which also holds for nodes carried
+        # up unpaired
+        per_page = self.tree_leaves_per_page()
+        first = min(self.step_index * per_page, leaf_total - 1)
+        last = min(leaf_total, first + per_page)
+        bottom = self.prev_button.rect.top - CONFIG["padding"]
+        row_height = min(60, (bottom - y) // len(levels))
+        column_width = rect.width / per_page
+        
+        def leaf_center(index):
+            return rect.x + (index - first + 0.5) * column_width
+            
+        positions = {}
+        for depth, level in enumerate(reversed(levels)):
+            height = len(levels) - 1 - depth
+            row_y = y + depth * row_height
+            for i in range(first >> height, ((last - 1) >> height) + 1):
+                covered_first = max(first, i << height)
+                covered_last = min(last, (i + 1) << height) - 1
+                positions[height, i] = ((leaf_center(covered_first) + leaf_center(covered_last)) / 2, row_y)
+                
+        # Edges first so the node boxes cover their ends
+        node_height = small_font.get_sized_height() + 6
+        for (height, i), (x, node_y) in positions.items():
+            parent = positions.get((height + 1, i >> 1))
+            if parent is not None:
+                pygame.draw.line(surface, CONFIG["text_color"], (parent[0], parent[1] + node_height),
+                                 (x, node_y), 1)
+                                 
+        for (height, i), (x, node_y) in positions.items():
+            label_surf, label_rect = render_text(small_font, levels[height][i].hex()[:8], CONFIG["text_color"])
+            box = pygame.Rect(0, 0, label_rect.width + 10, node_height)
+            box.midtop = (int(x), node_y)
+            is_root = height == len(levels) - 1
+            pygame.draw.rect(surface, CONFIG["highlight_color"] if is_root else CONFIG["bg_color"], box)
+            pygame.draw.rect(surface, CONFIG["text_color"], box, 1)
+            surface.blit(label_surf, (box.x + 5, box.y + 3))
+            
+        self.current_explanation = (f"Leaves {first + 1}-{last} of {leaf_total:,}, {self.tree_leaf_size:,} bytes each: "
+                                    f"leaf = H(0x00 || bytes), node = H(0x01 || left || right)")
+                                    
+    def draw_hmac(self, surface: pygame.Surface, rect: pygame.Rect):
+        key_label_surf, key_label_rect = render_text(font, "Key:", CONFIG["subtitle_color"])
+        surface.blit(key_label_surf, (rect.x, self.hmac_key_box.rect.centery - key_label_rect.height // 2))
+        y = self.hmac_key_box.rect.bottom + 30
+        if self.hmac_digests is None:
+            waiting_surf, _ = render_text(font, "Computing the HMAC...", CONFIG["text_color"])
+            surface.blit(waiting_surf, (rect.x, y))
+            self.current_explanation = "Type a key and press MAC"
+            return
+            
+        key = self.hmac_key
+        algorithm = self.current_algorithm
+        inner_digest, mac = self.hmac_digests
+        message_length = len(self.blocks.data)
+        block_bytes = key.block_bytes
+        # The inner pass hashes the message after one pad block, so its padding counts that block too
+        message_blocks = (message_length + len(algorithm.padding(block_bytes + message_length))) // block_bytes
+        
+        # One row of blocks per pass, each starting from a midstate that is cached per key
+        passes = [
+            ("Inner pass: H((K xor ipad) || message)", [
+                ("K xor ipad", key.inner_block.hex()[:16] + "...", "1 block", False),
+                ("Inner midstate", algorithm.format_hash(key.inner_state)[:16] + "...", "cached per key", True),
+                ("Message", f"{message_length:,} bytes + padding",
+                 f"{message_blocks:,} block{'s' if message_blocks != 1 else ''}", False),
+                ("Inner hash", inner_digest.hex()[:16] + "...", f"{key.digest_size} bytes", False),
+            ]),
+            ("Outer pass: H((K xor opad) || inner hash)", [
+                ("K xor opad", key.outer_block.hex()[:16] + "...", "1 block", False),
+                ("Outer midstate", algorithm.format_hash(key.outer_state)[:16] + "...", "cached per key", True),
+                ("Inner hash", f"{key.digest_size} bytes + padding", "1 block", False),
+                ("HMAC", mac.hex()[:16] + "...", f"{key.digest_size} bytes", False),
+            ]),
+        ]
+        gap = 40
+        box_width = (rect.width - 3 * gap) // 4
+        box_height = font.get_sized_height() + 2 * small_font.get_sized_height() + 24
+        line_height = small_font.get_sized_height() + 4
+        box_rows = []
+        for title, boxes in passes:
+            title_surf, title_rect = render_text(font, title, CONFIG["subtitle_color"])
+            surface.blit(title_surf, (rect.x, y))
+            y += title_rect.height + 12
+            row = []
+            for i, (name, value, size, cached) in enumerate(boxes):
+                box = pygame.Rect(rect.x + i * (box_width + gap), y, box_width, box_height)
+                pygame.draw.rect(surface, CONFIG["box_highlight"] if cached else CONFIG["box_color"], box, border_radius=5)
+                pygame.draw.rect(surface, CONFIG["highlight_color"] if cached else CONFIG["button_border_color"],
+                                 box, 2 if cached else 1, border_radius=5)
+                name_surf, name_rect = render_text(font, name, CONFIG["text_color"])
+                surface.blit(name_surf, (box.x + 8, box.y + 6))
+                for j, text in enumerate((value, size)):
+                    text_surf, _ = render_text(small_font, text, CONFIG["subtitle_color"])
+                    surface.blit(text_surf, (box.x + 8, box.y + name_rect.height + 12 + j * line_height))
+                if i:
+                    pygame.draw.line(surface, CONFIG["text_color"], (box.x - gap + 6, box.centery), (box.x - 6, box.centery), 2)
+                    pygame.draw.polygon(surface, CONFIG["text_color"], [(box.x - 6, box.centery),
+                                                                        (box.x - 12, box.centery - 5),
+                                                                        (box.x - 12, box.centery + 5)])
+                row.append(box)
+            box_rows.append(row)
+            y += box_height + 40
+            
+        # The inner hash is the message of the outer pass
+        inner_box, outer_box = box_rows[0][3], box_rows[1][2]
+        bend_y = inner_box.bottom + 14
+        pygame.draw.lines(surface, CONFIG["highlight_color"], False,
+                          [inner_box.midbottom, (inner_box.centerx, bend_y), (outer_box.centerx, bend_y),
+                           (outer_box.centerx, outer_box.y - 1)], 2)
+                           
+        name = algorithm.new().name
+        mac_surf, _ = render_text(small_font, f"hmac-{name}: {mac.hex()}", CONFIG["text_color"])
+        surface.blit(mac_surf, (rect.x, y))
+        self.current_explanation = (f"The pad blocks depend only on the key, so they are compressed once: "
+                                    f"each MAC costs {message_blocks + 1} compressions instead of {message_blocks + 3}")
+                                    
+    def copy_message(self):
+        pygame.scrap.put(pygame.SCRAP_TEXT, self.message.encode())
+        
+    def copy_hash(self):
+        pygame.scrap.put(pygame.SCRAP_TEXT, self.final_hash.encode())
+        
+    def skip_to_end(self):
+        # Chain through to the last block; its rounds are already in the trace
+        if self.current_scene == "compression" and self.walk:
+            self.load_block(len(self.blocks) - 1)
+            self.step_index = self.current_algorithm.rounds - 1
+
+def init_pygame():
+    """Initialize pygame, the window, the clipboard and the fonts"""
+    global font, title_font, small_font, explanation_font
+    
+    pygame.init()
+    screen = pygame.display.set_mode((CONFIG["width"], CONFIG["height"]))
+    pygame.display.set_caption("SHA Visualization")
+    
+    # Initialize clipboard functionality after display is created
+    pygame.scrap.init()
+    
+    font = pygame.freetype.SysFont("Arial", CONFIG["font_size"])
+    title_font = pygame.freetype.SysFont("Arial", CONFIG["title_font_size"])
+    small_font = pygame.freetype.SysFont("Arial", CONFIG["small_font_size"])
+    explanation_font = pygame.freetype.SysFont("Arial", CONFIG["explanation_font_size"])
+    
+    return screen
+
+def instrument(profiler):
+    """Time the scenes, widgets, text rendering and jobs of the visualizer with a profiling.Profiler"""
+    module = sys.modules[__name__]
+    profiler.instrument(module, ["render_text", "render_font", "bit_rows", "preview_text"], "text", prefix="gui.")
+    profiler.instrument(module, ["hash_job", "tree_job", "hmac_job"], "job", prefix="gui.")
+    scene_methods = [name for name in vars(Visualization) if name.startswith("draw")]
+    profiler.instrument(Visualization, scene_methods + ["update", "finish_job", "show_result", "load_block"],
+                        "draw", prefix="Visualization.")
+    for widget_class in (TextBox, Button, RadioButton, ScrollPane, ProgressBar):
+        profiler.instrument(widget_class, ["draw"], "draw", prefix=f"{widget_class.__name__}.")
+    profiler.instrument(TextBox, ["render"], "text", prefix="TextBox.")
+
+# Main game loop
+def main(profile_path=None, hud=False):
+    """Run the visualizer; with profile_path, record spans and write them there as a Chrome trace on exit"""
+    profiler = None
+    if profile_path:
+        from profiling import Profiler, instrument_engine
+        profiler = Profiler()
+        instrument_engine(profiler)
+        instrument(profiler)
+        
+    screen = init_pygame()
+    
+    clock = pygame.time.Clock()
+    visualization = Visualization()
+    visualization.profiler = profiler
+    visualization.hud.visible = hud
+    
+    while True:
+        dt = clock.tick(CONFIG["fps"]) / 1000.0
+        
+        events = pygame.event.get()
+        if not events and not visualization.needs_redraw():
+            # Nothing to do: sleep until input arrives or the cursor blinks
+            timeout = CONFIG["idle_timeout_ms"]
+            if visualization.current_scene == "intro" and visualization.text_box.active:
+                timeout = min(timeout, int(visualization.text_box.time_to_blink() * 1000) + 1)
+            if visualization.job is not None:
+                timeout = min(timeout, CONFIG["progress_poll_ms"])
+            event = pygame.event.wait(timeout)
+            if event.type != pygame.NOEVENT:
+                events = [event] + pygame.event.get()
+                
+        for event in events:
+            if event.type == pygame.QUIT:
+                visualization.cancel_job()
+                visualization.jobs.shutdown()
+                pygame.quit()
+                if profiler is not None:
+                    from profiling import print_summary
+                    profiler.save_chrome_trace(profile_path)
+                    print_summary(profiler)
+                sys.exit()
+                
+            if event.type == pygame.DROPFILE:
+                # Shift while dropping opens the file at its last block
+                shift = bool(pygame.key.get_mods() & pygame.KMOD_SHIFT)
+                visualization.open_file(event.file, (CONFIG["open_file_at"] == "last") != shift)
+            elif event.type == JOB_DONE:
+                visualization.finish_job(event.job)
+            elif event.type == pygame.KEYDOWN:
+                # Shortcuts are not typed into the text box
+                if event.key == pygame.K_ESCAPE and visualization.job is not None:
+                    visualization.cancel_job()
+                    continue
+                if event.key == pygame.K_o and event.mod & pygame.KMOD_CTRL:
+                    visualization.open_file_dialog()
+                    continue
+                if event.key == pygame.K_F3:
+                    visualization.toggle_hud()
+                    continue
+                    
+            if event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                visualization.invalidate()
+                
+            if event.type == pygame.VIDEORESIZE:
+                visualization.layout(event.w, event.h)
+                
+            # Only the current scene's widgets see the event
+            visualization.widgets.dispatch(visualization.current_scene, event)
+            
+        visualization.update(dt)
+        draw_start = time.perf_counter()
+        dirty_rects = visualization.draw(screen)
+        if visualization.hud.visible:
+            visualization.hud.record_frame(dt, time.perf_counter() - draw_start)
+        if dirty_rects:
+            pygame.display.update(dirty_rects)
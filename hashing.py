@@ -0,0 +1,866 @@
+"""SHA-2 hash engine.
+
+This module only depends on the standard library so it can be imported
+without pygame or a display.
+"""
+import bisect
+import mmap
+import os
+import stat
+import struct
+import sys
+from array import array
+
+from cache import LRUCache, blake2b
+from unrolled import build_compress
+
+# Lazy bit-string view used by the visualization scenes
+class BitView:
+    """Read-only '0'/'1' view over a byte buffer, formatted only when sliced.
+    
+    The view never copies the buffer, so the bit and hex renderings of a
+    message share the bytes that were hashed. tail holds bytes that follow
+    the buffer, such as the padding of a message.
+    """
+    def __init__(self, data, tail=b''):
+        self.data = memoryview(data).cast('B')
+        self.tail = memoryview(tail).cast('B')
+        
+    def __len__(self):
+        return (len(self.data) + len(self.tail)) * 8
+        
+    def byte_range(self, start, stop):
+        """The bytes in [start, stop), copied only when they straddle the tail"""
+        split = len(self.data)
+        if stop <= split:
+            return self.data[start:stop]
+        if start >= split:
+            return self.tail[start - split:stop - split]
+        return self.data[start:].tobytes() + self.tail[:stop - split].tobytes()
+        
+    def __getitem__(self, key):
+        if isinstance(key, int):
+            if key < 0:
+                key += len(self)
+            if not 0 <= key < len(self):
+                raise IndexError("bit index out of range")
+            return '1' if self.byte_range(key // 8, key // 8 + 1)[0] & (0x80 >> (key % 8)) else '0'
+            
+        start, stop, step = key.indices(len(self))
+        if stop <= start:
+            return ''
+        # Only format the bytes covered by the slice
+        first_byte = start // 8
+        last_byte = (stop + 7) // 8
+        bits = ''.join(format(byte, '08b') for byte in self.byte_range(first_byte, last_byte))
+        return bits[start - first_byte * 8:stop - first_byte * 8:step]
+        
+    def __str__(self):
+        return self[:]
+        
+    def hex(self, start=0, stop=None, sep=' '):
+        """Hex digits of the bytes in [start, stop), grouped per byte"""
+        size = len(self) // 8
+        stop = size if stop is None else min(stop, size)
+        data = self.byte_range(start, max(start, stop))
+        return data.hex(sep) if sep else data.hex()
+
+# Blocks of a padded message
+class MessageBlocks:
+    """The blocks of a padded message, without copying the message.
+    
+    Full blocks are views into the message itself; only the last partial
+    block and the padding are held separately, so a memory-mapped file can
+    be split into blocks for free.
+    """
+    def __init__(self, algorithm, data):
+        self.data = memoryview(data).cast('B')
+        self.block_bytes = algorithm.block_size // 8
+        self.full_blocks = len(self.data) // self.block_bytes
+        self.tail = self.data[self.full_blocks * self.block_bytes:].tobytes() + algorithm.padding(len(self.data))
+        
+    def __len__(self):
+        return self.full_blocks + len(self.tail) // self.block_bytes
+        
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("block index out of range")
+        if index < self.full_blocks:
+            start = index * self.block_bytes
+            return self.data[start:start + self.block_bytes]
+        start = (index - self.full_blocks) * self.block_bytes
+        return memoryview(self.tail)[start:start + self.block_bytes]
+        
+    def padding(self):
+        """Bytes that follow the full blocks: the partial last block and the padding"""
+        return self.tail
+        
+    def padded_bits(self):
+        """BitView of the whole padded message"""
+        return BitView(self.data[:self.full_blocks * self.block_bytes], self.tail)
+
+# Per-round record of the compression function
+class CompressionTrace:
+    """Every round of one block's compression, stored flat in an array('Q').
+    
+    Each round contributes one row of TRACE_FIELDS: the working variables
+    a-h after the round, followed by the intermediate values that produced
+    them. Rows are looked up by index, so any round can be shown in O(1).
+    """
+    TRACE_FIELDS = ("a", "b", "c", "d", "e", "f", "g", "h", "T1", "T2", "S0", "S1", "Ch", "Maj")
+    
+    def __init__(self, initial_values, schedule, values, hash_values):
+        self.initial_values = list(initial_values)  # Working variables before round 0
+        self.schedule = schedule
+        self.values = values
+        self.hash_values = hash_values  # Chaining values after this block
+        self.rounds = len(values) // len(self.TRACE_FIELDS)
+        
+    def __len__(self):
+        return self.rounds
+        
+    @property
+    def nbytes(self):
+        """Approximate memory held by the trace and its schedule"""
+        return (self.values.itemsize * len(self.values) + sys.getsizeof(self.schedule) +
+                sum(sys.getsizeof(word) for word in self.schedule))
+                
+    def state(self, round_index):
+        """Return the working variables a-h after a round (-1 for the initial values)"""
+        if round_index < 0:
+            return list(self.initial_values)
+        width = len(self.TRACE_FIELDS)
+        start = round_index * width
+        return self.values[start:start + 8].tolist()
+        
+    def intermediates(self, round_index):
+        """Return T1, T2, S0, S1, Ch and Maj as computed in a round"""
+        width = len(self.TRACE_FIELDS)
+        start = round_index * width
+        return dict(zip(self.TRACE_FIELDS[8:], self.values[start + 8:start + width]))
+
+# Hash Algorithm Base Class
+class HashAlgorithm:
+    """Base class for hash algorithms"""
+    def __init__(self):
+        self.name = "Base"
+        self.word_size = 0
+        self.block_size = 0
+        self.rounds = 0
+        self.digest_bits = 0  # Output length; the truncated variants keep fewer bits than H0-H7 hold
+        self.length_size = 0
+        self.padding_offset = 0
+        self.word_format = ""
+        # Rotation amounts of the round functions Σ0/Σ1, and the rotations
+        # plus final shift of the schedule functions σ0/σ1
+        self.sum0_rotations = ()
+        self.sum1_rotations = ()
+        self.sigma0_shifts = ()
+        self.sigma1_shifts = ()
+        self.k_values = []
+        self.init_values = []
+        
+    def rotr(self, x, n, bits=None):
+        """Rotate right: circular right shift"""
+        if bits is None:
+            bits = self.word_size
+        mask = (1 << bits) - 1
+        return ((x >> n) | (x << (bits - n))) & mask
+        
+    def padding(self, message_length):
+        """Return the padding bytes that follow a message of message_length bytes"""
+        block_bytes = self.block_size // 8
+        length_bytes = self.length_size // 8
+        
+        # Room for the 0x80 marker byte and the length field
+        zero_count = (block_bytes - (message_length + 1 + length_bytes) % block_bytes) % block_bytes
+        return b'\x80' + bytes(zero_count) + (message_length * 8).to_bytes(length_bytes, 'big')
+        
+    def pad_message(self, data):
+        """Pad a byte message to a multiple of the block size"""
+        data = memoryview(data).cast('B')
+        # join() copies the message exactly once
+        return b''.join((data, self.padding(len(data))))
+        
+    def split_blocks(self, padded):
+        """Split a padded message into block views without copying"""
+        block_bytes = self.block_size // 8
+        view = memoryview(padded)
+        return [view[i:i+block_bytes] for i in range(0, len(view), block_bytes)]
+        
+    def prepare_message_schedule(self, block):
+        """Prepare message schedule from block"""
+        pass
+        
+    def compress_block(self, block, hash_values):
+        """Compress a single block"""
+        pass
+        
+    def compress(self, block, hash_values):
+        """Compress a single block with the unrolled function and return only the new hash values.
+        
+        The function is generated on first use, since compiling the SHA-512
+        one takes longer than the whole import budget, and then replaces
+        this method on the instance.
+        """
+        # A caller may still hold this bound method after the replacement
+        compress = self.__dict__.get("compress")
+        if compress is None:
+            compress = self.compress = build_compress(self)
+        return compress(block, hash_values)
+        
+    def compression_trace(self, block, hash_values):
+        """Compress a single block, recording every round in a CompressionTrace"""
+        w = self.prepare_message_schedule(block)
+        mask = (1 << self.word_size) - 1
+        rotr = self.rotr
+        sum0_a, sum0_b, sum0_c = self.sum0_rotations
+        sum1_a, sum1_b, sum1_c = self.sum1_rotations
+        
+        values = array('Q')
+        a, b, c, d, e, f, g, h = hash_values
+        for i in range(self.rounds):
+            S1 = rotr(e, sum1_a) ^ rotr(e, sum1_b) ^ rotr(e, sum1_c)
+            ch = (e & f) ^ ((~e) & g)
+            temp1 = (h + S1 + ch + self.k_values[i] + w[i]) & mask
+            S0 = rotr(a, sum0_a) ^ rotr(a, sum0_b) ^ rotr(a, sum0_c)
+            maj = (a & b) ^ (a & c) ^ (b & c)
+            temp2 = (S0 + maj) & mask
+            
+            h = g
+            g = f
+            f = e
+            e = (d + temp1) & mask
+            d = c
+            c = b
+            b = a
+            a = (temp1 + temp2) & mask
+            
+            values.extend((a, b, c, d, e, f, g, h, temp1, temp2, S0, S1, ch, maj))
+            
+        new_hash = [(x + y) & mask for x, y in zip(hash_values, (a, b, c, d, e, f, g, h))]
+        return CompressionTrace(hash_values, w, values, new_hash)
+        
+    def process_message(self, message):
+        """Process entire message and return hash"""
+        data = message.encode('utf-8') if isinstance(message, str) else message
+        data = memoryview(data).cast('B')
+        
+        # Break the message into blocks; only the last one is padded in a
+        # separate buffer, so the message itself is never copied
+        blocks = MessageBlocks(self, data)
+        
+        # Initialize hash values
+        hash_values = list(self.init_values)
+        
+        # Process each block
+        for block in blocks:
+            hash_values = self.compress(block, hash_values)
+            
+        # Bit-string views over the message are only formatted when a scene draws them
+        return self.format_hash(hash_values), BitView(data), blocks.padded_bits(), blocks
+        
+    def format_hash(self, hash_values):
+        """Format hash values as hex string"""
+        pass
+        
+    def new(self, data=b''):
+        """Create a streaming hasher, optionally fed with initial data"""
+        return Hasher(self, data)
+
+# SHA-256 Implementation
+class SHA256(HashAlgorithm):
+    def __init__(self):
+        super().__init__()
+        self.name = "SHA-256"
+        self.word_size = 32
+        self.block_size = 512
+        self.rounds = 64
+        self.digest_bits = 256
+        self.length_size = 64
+        self.padding_offset = 448
+        self.word_format = ">16I"
+        self.sum0_rotations = (2, 13, 22)
+        self.sum1_rotations = (6, 11, 25)
+        self.sigma0_shifts = (7, 18, 3)
+        self.sigma1_shifts = (17, 19, 10)
+        
+        # SHA-256 constants
+        self.k_values = [
+            0x428a2f98, 0x71374491, 0xb5c0fbcf, 0xe9b5dba5, 0x3956c25b, 0x59f111f1, 0x923f82a4, 0xab1c5ed5,
+            0xd807aa98, 0x12835b01, 0x243185be, 0x550c7dc3, 0x72be5d74, 0x80deb1fe, 0x9bdc06a7, 0xc19bf174,
+            0xe49b69c1, 0xefbe4786, 0x0fc19dc6, 0x240ca1cc, 0x2de92c6f, 0x4a7484aa, 0x5cb0a9dc, 0x76f988da,
+            0x983e5152, 0xa831c66d, 0xb00327c8, 0xbf597fc7, 0xc6e00bf3, 0xd5a79147, 0x06ca6351, 0x14292967,
+            0x27b70a85, 0x2e1b2138, 0x4d2c6dfc, 0x53380d13, 0x650a7354, 0x766a0abb, 0x81c2c92e, 0x92722c85,
+            0xa2bfe8a1, 0xa81a664b, 0xc24b8b70, 0xc76c51a3, 0xd192e819, 0xd6990624, 0xf40e3585, 0x106aa070,
+            0x19a4c116, 0x1e376c08, 0x2748774c, 0x34b0bcb5, 0x391c0cb3, 0x4ed8aa4a, 0x5b9cca4f, 0x682e6ff3,
+            0x748f82ee, 0x78a5636f, 0x84c87814, 0x8cc70208, 0x90befffa, 0xa4506ceb, 0xbef9a3f7, 0xc67178f2
+        ]
+        
+        # Initial hash values
+        self.init_values = [
+            0x6a09e667, 0xbb67ae85, 0x3c6ef372, 0xa54ff53a, 0x510e527f, 0x9b05688c, 0x1f83d9ab, 0x5be0cd19
+        ]
+        
+    def prepare_message_schedule(self, block):
+        # Break block into words
+        w = list(struct.unpack(self.word_format, block))
+        w.extend([0] * (self.rounds - 16))
+        
+        # Extend the words
+        for i in range(16, self.rounds):
+            s0 = self.rotr(w[i-15], 7) ^ self.rotr(w[i-15], 18) ^ (w[i-15] >> 3)
+            s1 = self.rotr(w[i-2], 17) ^ self.rotr(w[i-2], 19) ^ (w[i-2] >> 10)
+            w[i] = (w[i-16] + s0 + w[i-7] + s1) & 0xFFFFFFFF
+            
+        return w
+        
+    def compress_block(self, block, hash_values):
+        # Prepare message schedule
+        w = self.prepare_message_schedule(block)
+        
+        # Initialize working variables
+        a, b, c, d, e, f, g, h = hash_values
+        
+        # Compression function main loop
+        for i in range(self.rounds):
+            S1 = self.rotr(e, 6) ^ self.rotr(e, 11) ^ self.rotr(e, 25)
+            ch = (e & f) ^ ((~e) & g)
+            temp1 = (h + S1 + ch + self.k_values[i] + w[i]) & 0xFFFFFFFF
+            S0 = self.rotr(a, 2) ^ self.rotr(a, 13) ^ self.rotr(a, 22)
+            maj = (a & b) ^ (a & c) ^ (b & c)
+            temp2 = (S0 + maj) & 0xFFFFFFFF
+            
+            h = g
+            g = f
+            f = e
+            e = (d + temp1) & 0xFFFFFFFF
+            d = c
+            c = b
+            b = a
+            a = (temp1 + temp2) & 0xFFFFFFFF
+            
+        # Update hash values
+        new_hash = [
+            (hash_values[0] + a) & 0xFFFFFFFF,
+            (hash_values[1] + b) & 0xFFFFFFFF,
+            (hash_values[2] + c) & 0xFFFFFFFF,
+            (hash_values[3] + d) & 0xFFFFFFFF,
+            (hash_values[4] + e) & 0xFFFFFFFF,
+            (hash_values[5] + f) & 0xFFFFFFFF,
+            (hash_values[6] + g) & 0xFFFFFFFF,
+            (hash_values[7] + h) & 0xFFFFFFFF
+        ]
+        
+        return new_hash, w, [a, b, c, d, e, f, g, h]
+        
+    def format_hash(self, hash_values):
+        return ''.join(format(h, '08x') for h in hash_values)[:self.digest_bits // 4]
+
+# SHA-224: SHA-256 with other initial values, truncated to 224 bits
+class SHA224(SHA256):
+    def __init__(self):
+        super().__init__()
+        self.name = "SHA-224"
+        self.digest_bits = 224
+        self.init_values = [
+            0xc1059ed8, 0x367cd507, 0x3070dd17, 0xf70e5939, 0xffc00b31, 0x68581511, 0x64f98fa7, 0xbefa4fa4
+        ]
+
+# SHA-512 Implementation
+class SHA512(HashAlgorithm):
+    def __init__(self):
+        super().__init__()
+        self.name = "SHA-512"
+        self.word_size = 64
+        self.block_size = 1024
+        self.rounds = 80
+        self.digest_bits = 512
+        self.length_size = 128
+        self.padding_offset = 896
+        self.word_format = ">16Q"
+        self.sum0_rotations = (28, 34, 39)
+        self.sum1_rotations = (14, 18, 41)
+        self.sigma0_shifts = (1, 8, 7)
+        self.sigma1_shifts = (19, 61, 6)
+        
+        # SHA-512 constants
+        self.k_values = [
+            0x428a2f98d728ae22, 0x7137449123ef65cd, 0xb5c0fbcfec4d3b2f, 0xe9b5dba58189dbbc,
+            0x3956c25bf348b538, 0x59f111f1b605d019, 0x923f82a4af194f9b, 0xab1c5ed5da6d8118,
+            0xd807aa98a3030242, 0x12835b0145706fbe, 0x243185be4ee4b28c, 0x550c7dc3d5ffb4e2,
+            0x72be5d74f27b896f, 0x80deb1fe3b1696b1, 0x9bdc06a725c71235, 0xc19bf174cf692694,
+            0xe49b69c19ef14ad2, 0xefbe4786384f25e3, 0x0fc19dc68b8cd5b5, 0x240ca1cc77ac9c65,
+            0x2de92c6f592b0275, 0x4a7484aa6ea6e483, 0x5cb0a9dcbd41fbd4, 0x76f988da831153b5,
+            0x983e5152ee66dfab, 0xa831c66d2db43210, 0xb00327c898fb213f, 0xbf597fc7beef0ee4,
+            0xc6e00bf33da88fc2, 0xd5a79147930aa725, 0x06ca6351e003826f, 0x142929670a0e6e70,
+            0x27b70a8546d22ffc, 0x2e1b21385c26c926, 0x4d2c6dfc5ac42aed, 0x53380d139d95b3df,
+            0x650a73548baf63de, 0x766a0abb3c77b2a8, 0x81c2c92e47edaee6, 0x92722c851482353b,
+            0xa2bfe8a14cf10364, 0xa81a664bbc423001, 0xc24b8b70d0f89791, 0xc76c51a30654be30,
+            0xd192e819d6ef5218, 0xd69906245565a910, 0xf40e35855771202a, 0x106aa07032bbd1b8,
+            0x19a4c116b8d2d0c8, 0x1e376c085141ab53, 0x2748774cdf8eeb99, 0x34b0bcb5e19b48a8,
+            0x391c0cb3c5c95a63, 0x4ed8aa4ae3418acb, 0x5b9cca4f7763e373, 0x682e6ff3d6b2b8a3,
+            0x748f82ee5defb2fc, 0x78a5636f43172f60, 0x84c87814a1f0ab72, 0x8cc702081a6439ec,
+            0x90befffa23631e28, 0xa4506cebde82bde9, 0xbef9a3f7b2c67915, 0xc67178f2e372532b,
+            0xca273eceea26619c, 0xd186b8c721c0c207, 0xeada7dd6cde0eb1e, 0xf57d4f7fee6ed178,
+            0x06f067aa72176fba, 0x0a637dc5a2c898a6, 0x113f9804bef90dae, 0x1b710b35131c471b,
+            0x28db77f523047d84, 0x32caab7b40c72493, 0x3c9ebe0a15c9bebc, 0x431d67c49c100d4c,
+            0x4cc5d4becb3e42b6, 0x597f299cfc657e2a, 0x5fcb6fab3ad6faec, 0x6c44198c4a475817
+        ]
+        
+        # Initial hash values
+        self.init_values = [
+            0x6a09e667f3bcc908, 0xbb67ae8584caa73b, 0x3c6ef372fe94f82b, 0xa54ff53a5f1d36f1,
+            0x510e527fade682d1, 0x9b05688c2b3e6c1f, 0x1f83d9abfb41bd6b, 0x5be0cd19137e2179
+        ]
+        
+    def prepare_message_schedule(self, block):
+        # Break block into words
+        w = list(struct.unpack(self.word_format, block))
+        w.extend([0] * (self.rounds - 16))
+        
+        # Extend the words
+        for i in range(16, self.rounds):
+            s0 = self.rotr(w[i-15], 1) ^ self.rotr(w[i-15], 8) ^ (w[i-15] >> 7)
+            s1 = self.rotr(w[i-2], 19) ^ self.rotr(w[i-2], 61) ^ (w[i-2] >> 6)
+            w[i] = (w[i-16] + s0 + w[i-7] + s1) & 0xFFFFFFFFFFFFFFFF
+            
+        return w
+        
+    def compress_block(self, block, hash_values):
+        # Prepare message schedule
+        w = self.prepare_message_schedule(block)
+        
+        # Initialize working variables
+        a, b, c, d, e, f, g, h = hash_values
+        
+        # Compression function main loop
+        for i in range(self.rounds):
+            S1 = self.rotr(e, 14) ^ self.rotr(e, 18) ^ self.rotr(e, 41)
+            ch = (e & f) ^ ((~e) & g)
+            temp1 = (h + S1 + ch + self.k_values[i] + w[i]) & 0xFFFFFFFFFFFFFFFF
+            S0 = self.rotr(a, 28) ^ self.rotr(a, 34) ^ self.rotr(a, 39)
+            maj = (a & b) ^ (a & c) ^ (b & c)
+            temp2 = (S0 + maj) & 0xFFFFFFFFFFFFFFFF
+            
+            h = g
+            g = f
+            f = e
+            e = (d + temp1) & 0xFFFFFFFFFFFFFFFF
+            d = c
+            c = b
+            b = a
+            a = (temp1 + temp2) & 0xFFFFFFFFFFFFFFFF
+            
+        # Update hash values
+        new_hash = [
+            (hash_values[0] + a) & 0xFFFFFFFFFFFFFFFF,
+            (hash_values[1] + b) & 0xFFFFFFFFFFFFFFFF,
+            (hash_values[2] + c) & 0xFFFFFFFFFFFFFFFF,
+            (hash_values[3] + d) & 0xFFFFFFFFFFFFFFFF,
+            (hash_values[4] + e) & 0xFFFFFFFFFFFFFFFF,
+            (hash_values[5] + f) & 0xFFFFFFFFFFFFFFFF,
+            (hash_values[6] + g) & 0xFFFFFFFFFFFFFFFF,
+            (hash_values[7] + h) & 0xFFFFFFFFFFFFFFFF
+        ]
+        
+        return new_hash, w, [a, b, c, d, e, f, g, h]
+        
+    def format_hash(self, hash_values):
+        return ''.join(format(h, '016x') for h in hash_values)[:self.digest_bits // 4]
+
+# SHA-384, SHA-512/224 and SHA-512/256: SHA-512 with other initial values, truncated
+class SHA384(SHA512):
+    def __init__(self):
+        super().__init__()
+        self.name = "SHA-384"
+        self.digest_bits = 384
+        self.init_values = [
+            0xcbbb9d5dc1059ed8, 0x629a292a367cd507, 0x9159015a3070dd17, 0x152fecd8f70e5939,
+            0x67332667ffc00b31, 0x8eb44a8768581511, 0xdb0c2e0d64f98fa7, 0x47b5481dbefa4fa4
+        ]
+
+class SHA512_224(SHA512):
+    def __init__(self):
+        super().__init__()
+        self.name = "SHA-512/224"
+        self.digest_bits = 224
+        self.init_values = [
+            0x8c3d37c819544da2, 0x73e1996689dcd4d6, 0x1dfab7ae32ff9c82, 0x679dd514582f9fcf,
+            0x0f6d2b697bd44da8, 0x77e36f7304c48942, 0x3f9d85a86a1d36c8, 0x1112e6ad91d692a1
+        ]
+
+class SHA512_256(SHA512):
+    def __init__(self):
+        super().__init__()
+        self.name = "SHA-512/256"
+        self.digest_bits = 256
+        self.init_values = [
+            0x22312194fc2bf72c, 0x9f555fa3c84c64c2, 0x2393b86b6f53b151, 0x963877195940eabd,
+            0x96283ee2a88effe3, 0xbe5e1e2553863992, 0x2b0199fc2c85b8aa, 0x0eb72ddc81c52ca2
+        ]
+
+# Lazy per-block view of a message for the visualizer
+class BlockWalk:
+    """Walks the blocks of a padded message, chaining H0-H7 between them.
+    
+    Chaining values are only computed up to the furthest block visited, and
+    a block's schedule and round trace are computed on its first visit and
+    then cached, so messages with thousands of blocks can be browsed
+    without precomputing all of them. Passing a shared, size-bounded
+    trace_cache (keyed by (cache_key, block index)) caps the memory
+    used by traces across many walks. checkpoints ({block index: H0-H7
+    before that block}, as recorded by hash_checkpointed()) let the walk
+    start near any block instead of at the first one.
+    """
+    def __init__(self, algorithm, blocks, trace_cache=None, cache_key=None, checkpoints=None):
+        self.algorithm = algorithm
+        self.blocks = blocks
+        self.chain = {0: list(algorithm.init_values)}  # chain[i] = H0-H7 before block i
+        if checkpoints:
+            self.chain.update((index, list(values)) for index, values in checkpoints.items())
+        self.known = sorted(self.chain)  # Indices in chain, for finding the nearest one
+        self.traces = trace_cache if trace_cache is not None else LRUCache()
+        self.cache_key = cache_key
+        
+    def __len__(self):
+        return len(self.blocks)
+        
+    def chaining_values(self, index):
+        """Return H0-H7 as they are before block index (index == len gives the final values)"""
+        if not 0 <= index <= len(self.blocks):
+            raise IndexError("block index out of range")
+        if index in self.chain:
+            return self.chain[index]
+            
+        # Walk forward from the nearest earlier block with known values
+        i = self.known[bisect.bisect_right(self.known, index) - 1]
+        hash_values = self.chain[i]
+        while i < index:
+            if (self.cache_key, i) in self.traces:
+                hash_values = self.traces.get((self.cache_key, i)).hash_values
+            else:
+                hash_values = self.algorithm.compress(self.blocks[i], hash_values)
+            i += 1
+            self.chain[i] = hash_values
+            bisect.insort(self.known, i)
+        return hash_values
+        
+    def share_traces(self, trace_cache, cache_key):
+        """Move the traces computed so far into a shared cache and keep using it"""
+        for (_, index), (trace, size) in list(self.traces.entries.items()):
+            trace_cache.put((cache_key, index), trace, size)
+        self.traces = trace_cache
+        self.cache_key = cache_key
+        
+    def trace(self, index):
+        """Return the CompressionTrace of block index, computing it on first use"""
+        trace = self.traces.get((self.cache_key, index))
+        if trace is None:
+            trace = self.algorithm.compression_trace(self.blocks[index], self.chaining_values(index))
+            self.traces.put((self.cache_key, index), trace, trace.nbytes)
+        return trace
+
+# Streaming hasher
+class Hasher:
+    """hashlib-style incremental hasher built on the unrolled compress().
+    
+    Only a partial block is ever buffered; everything else is folded into
+    the chaining values as soon as a full block is available.
+    """
+    def __init__(self, algorithm, data=b''):
+        self.algorithm = algorithm
+        self.name = algorithm.name.replace("-", "").replace("/", "_").lower()
+        self.block_size = algorithm.block_size // 8
+        self.digest_size = len(algorithm.format_hash(algorithm.init_values)) // 2
+        self.hash_values = list(algorithm.init_values)
+        self.length = 0  # Total bytes fed so far
+        self.buffer = b''
+        if data:
+            self.update(data)
+            
+    def update(self, data):
+        view = memoryview(data).cast('B')
+        self.length += len(view)
+        block_bytes = self.block_size
+        offset = 0
+        
+        # Complete a previously buffered partial block first
+        if self.buffer:
+            needed = block_bytes - len(self.buffer)
+            if len(view) < needed:
+                self.buffer += view.tobytes()
+                return
+            self.hash_values = self.algorithm.compress(self.buffer + view[:needed], self.hash_values)
+            self.buffer = b''
+            offset = needed
+            
+        # Compress full blocks straight from the caller's buffer
+        end = offset + (len(view) - offset) // block_bytes * block_bytes
+        hash_values = self.hash_values
+        compress = self.algorithm.compress
+        for i in range(offset, end, block_bytes):
+            hash_values = compress(view[i:i+block_bytes], hash_values)
+        self.hash_values = hash_values
+        
+        self.buffer = view[end:].tobytes()
+        
+    def _final_hash_values(self):
+        tail = self.buffer + self.algorithm.padding(self.length)
+        hash_values = self.hash_values
+        for block in self.algorithm.split_blocks(tail):
+            hash_values = self.algorithm.compress(block, hash_values)
+        return hash_values
+        
+    def hexdigest(self):
+        return self.algorithm.format_hash(self._final_hash_values())
+        
+    def digest(self):
+        return bytes.fromhex(self.hexdigest())
+        
+    def copy(self):
+        other = Hasher.__new__(Hasher)
+        other.__dict__.update(self.__dict__)
+        other.hash_values = list(self.hash_values)
+        return other
+        
+    def export_state(self):
+        """The midstate as a JSON-serializable dict: H0-H7, total length and the buffered tail"""
+        return {
+            "algorithm": self.name,
+            "hash_values": list(self.hash_values),
+            "length": self.length,
+            "buffer": self.buffer.hex(),
+        }
+        
+    @classmethod
+    def from_state(cls, state):
+        """Rebuild a hasher from export_state(); it continues with the bytes after state["length"]"""
+        hasher = ALGORITHMS[state["algorithm"]].new()
+        hash_values = list(state["hash_values"])
+        length = state["length"]
+        buffer = bytes.fromhex(state["buffer"])
+        word_limit = 1 << hasher.algorithm.word_size
+        # The length in bits has to fit the length field of the padding
+        length_limit = 1 << hasher.algorithm.length_size
+        # Exact ints only: 1.5 or true would otherwise pass as a wrong midstate
+        if (len(hash_values) != 8 or not all(type(value) is int and 0 <= value < word_limit for value in hash_values)
+                or type(length) is not int or not 0 <= length * 8 < length_limit
+                or length % hasher.block_size != len(buffer)):
+            raise ValueError(f"inconsistent {hasher.name} state")
+        hasher.hash_values = hash_values
+        hasher.length = length
+        hasher.buffer = buffer
+        return hasher
+
+# Shared-prefix midstate cache
+PREFIX_CACHE_BYTES = 64 * 1024 * 1024
+PREFIX_ENTRY_BYTES = 400  # Key, tuple of eight ints and the LRU bookkeeping, roughly
+
+class PrefixCache:
+    """H0-H7 after every full block of recently hashed messages.
+    
+    Entries are keyed by a rolling BLAKE2 digest of the algorithm name and
+    the message blocks so far, which costs next to nothing next to a
+    compression. Hashing a message looks for the longest prefix of full
+    blocks that is cached and only compresses the blocks after it, so
+    messages that differ only near the end skip most of the work. The
+    padding blocks depend on the total length and are never cached.
+    """
+    def __init__(self, max_bytes=PREFIX_CACHE_BYTES):
+        self.entries = LRUCache(max_bytes=max_bytes)
+        self.hits = 0    # Messages that resumed from a cached prefix
+        self.misses = 0  # Messages with full blocks that started from init_values
+        self.blocks_skipped = 0
+        self.blocks_compressed = 0
+        
+    def prefix_keys(self, algorithm, data):
+        """Rolling digests of data[:block_bytes], data[:2 * block_bytes], ... over its full blocks"""
+        block_bytes = algorithm.block_size // 8
+        rolling = blake2b(algorithm.name.encode("ascii"), digest_size=16)
+        keys = []
+        for offset in range(0, len(data) - block_bytes + 1, block_bytes):
+            rolling.update(data[offset:offset + block_bytes])
+            keys.append(rolling.digest())
+        return keys
+        
+    def new(self, algorithm, data):
+        """A Hasher that has consumed data, resuming from the longest cached prefix"""
+        data = memoryview(data).cast('B')
+        block_bytes = algorithm.block_size // 8
+        keys = self.prefix_keys(algorithm, data)
+        
+        # Longest cached prefix first
+        start = 0
+        hash_values = list(algorithm.init_values)
+        for index in range(len(keys) - 1, -1, -1):
+            if keys[index] in self.entries:
+                hash_values = list(self.entries.get(keys[index]))
+                start = index + 1
+                break
+        if start:
+            self.hits += 1
+        elif keys:
+            self.misses += 1
+        self.blocks_skipped += start
+        self.blocks_compressed += len(keys) - start
+        
+        compress = algorithm.compress
+        for index in range(start, len(keys)):
+            offset = index * block_bytes
+            hash_values = compress(data[offset:offset + block_bytes], hash_values)
+            self.entries.put(keys[index], tuple(hash_values), PREFIX_ENTRY_BYTES)
+            
+        hasher = algorithm.new()
+        hasher.hash_values = hash_values
+        hasher.length = len(keys) * block_bytes
+        hasher.update(data[hasher.length:])
+        return hasher
+        
+    def hexdigest(self, algorithm, data):
+        return self.new(algorithm, data).hexdigest()
+        
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+        
+    def clear(self):
+        self.entries.clear()
+
+# Create hash algorithm instances
+sha224 = SHA224()
+sha256 = SHA256()
+sha384 = SHA384()
+sha512 = SHA512()
+sha512_224 = SHA512_224()
+sha512_256 = SHA512_256()
+
+# Keys follow hashlib's names
+ALGORITHMS = {
+    "sha224": sha224,
+    "sha256": sha256,
+    "sha384": sha384,
+    "sha512": sha512,
+    "sha512_224": sha512_224,
+    "sha512_256": sha512_256,
+}
+
+# File and stream hashing
+READ_SIZE = 1 << 20  # Buffered read size for streams that cannot be mapped
+
+def hash_stream(algorithm, stream):
+    """Hash a binary stream with large buffered reads"""
+    hasher = algorithm.new()
+    for chunk in iter(lambda: stream.read(READ_SIZE), b''):
+        hasher.update(chunk)
+    return hasher.hexdigest()
+
+def read_file(path):
+    """Return the contents of a file, memory-mapped when possible"""
+    with open(path, "rb") as f:
+        try:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):
+            # Empty files, pipes and devices cannot be mapped
+            return f.read()
+
+CHECKPOINT_BLOCKS = 256  # Blocks between the chaining values kept by hash_checkpointed()
+
+def hash_checkpointed(algorithm, data, interval=CHECKPOINT_BLOCKS, progress=None):
+    """Hash a buffer, keeping H0-H7 every interval blocks for BlockWalk.
+    
+    Returns (hexdigest, {block index: H0-H7 before that block}). progress,
+    if given, is called with the number of bytes hashed so far after every
+    interval blocks; it may raise to abandon the hash.
+    """
+    data = memoryview(data).cast('B')
+    hasher = algorithm.new()
+    step = interval * hasher.block_size
+    checkpoints = {}
+    for offset in range(0, len(data), step):
+        hasher.update(data[offset:offset + step])
+        # A buffered partial block only happens at the very end
+        if not hasher.buffer:
+            checkpoints[hasher.length // hasher.block_size] = tuple(hasher.hash_values)
+        if progress:
+            progress(hasher.length)
+    return hasher.hexdigest(), checkpoints
+
+# Resumable hashing of large files
+RESUME_BLOCKS = 16384  # Blocks between checkpoints written by hash_file_resumable()
+
+def save_checkpoint(path, hasher, source):
+    """Atomically write a hasher's midstate and the source it belongs to"""
+    # json pulls in re, which would double the engine's import time
+    import json
+    temp_path = path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump({"source": source, "state": hasher.export_state()}, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+def load_checkpoint(path, source):
+    """The hasher saved at path for source, or None if there is no usable checkpoint"""
+    import json
+    try:
+        with open(path, encoding="utf-8") as f:
+            saved = json.load(f)
+        if saved["source"] != source:
+            return None
+        return Hasher.from_state(saved["state"])
+    except FileNotFoundError:
+        return None
+    except (ValueError, KeyError, TypeError):
+        # Unreadable checkpoints are ignored; the file is hashed from the start
+        return None
+
+def hash_file_resumable(algorithm, path, checkpoint_path, interval=RESUME_BLOCKS, progress=None):
+    """Hash a file, saving the midstate to checkpoint_path every interval blocks.
+    
+    A checkpoint left by an interrupted run over the same file (same size
+    and modification time) is picked up, and reading continues from the
+    length it recorded. The checkpoint is removed once the digest is known.
+    Pipes and devices cannot be read again from an offset, so they are
+    hashed in one go without a checkpoint. progress, if given, is called
+    with the bytes hashed so far.
+    """
+    st = os.stat(path)
+    if not stat.S_ISREG(st.st_mode):
+        return hash_file(algorithm, path)
+    source = {"path": os.path.abspath(path), "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+    hasher = load_checkpoint(checkpoint_path, source)
+    if hasher is None or hasher.algorithm is not algorithm:
+        hasher = algorithm.new()
+        
+    step = interval * hasher.block_size
+    with open(path, "rb") as f:
+        f.seek(hasher.length)
+        for chunk in iter(lambda: f.read(step), b''):
+            hasher.update(chunk)
+            save_checkpoint(checkpoint_path, hasher, source)
+            if progress:
+                progress(hasher.length)
+                
+    digest = hasher.hexdigest()
+    try:
+        os.remove(checkpoint_path)
+    except FileNotFoundError:
+        pass  # Empty files finish before the first checkpoint
+    return digest
+
+def hash_file(algorithm, path):
+    """Hash a file, memory-mapping it when possible; '-' reads stdin"""
+    if path == "-":
+        return hash_stream(algorithm, sys.stdin.buffer)
+        
+    with open(path, "rb") as f:
+        try:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):
+            # Empty files, pipes and devices cannot be mapped
+            return hash_stream(algorithm, f)
+        with mapped:
+            return algorithm.new(mapped).hexdigest()
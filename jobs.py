@@ -0,0 +1,66 @@
+"""Background jobs for the visualizer.
+
+Hashing a large file takes far longer than a frame, so the GUI hands it
+to a worker thread and keeps drawing. The worker reports progress on the
+Job, which the GUI polls every frame, and on_done is called (from the
+worker thread) once the job has finished, failed or been cancelled.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+class JobCancelled(Exception):
+    """Raised inside a job once it has been cancelled"""
+
+class Job:
+    """One unit of background work with progress the UI can poll"""
+    def __init__(self, description, total=0):
+        self.description = description
+        self.total = total  # Bytes to process, 0 if unknown
+        self.done = 0
+        self.started = time.perf_counter()
+        self.future = None
+        self._cancelled = threading.Event()
+        
+    def cancel(self):
+        self._cancelled.set()
+        
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+        
+    def advance(self, done):
+        """Record progress from the worker; raises JobCancelled once the job is cancelled"""
+        self.done = done
+        if self._cancelled.is_set():
+            raise JobCancelled()
+            
+    def fraction(self):
+        return min(1.0, self.done / self.total) if self.total else 0.0
+        
+    def rate(self):
+        """Bytes processed per second so far"""
+        elapsed = time.perf_counter() - self.started
+        return self.done / elapsed if elapsed > 0 else 0.0
+        
+    def running(self):
+        return self.future is not None and not self.future.done()
+        
+    def result(self):
+        """The job's return value; raises whatever the job raised"""
+        return self.future.result()
+
+class JobRunner:
+    """Runs jobs one after another on a single worker thread"""
+    def __init__(self, on_done):
+        self.on_done = on_done
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="hash-job")
+        
+    def submit(self, job, func, *args):
+        """Run func(job, *args) in the background and return job"""
+        job.future = self.executor.submit(func, job, *args)
+        job.future.add_done_callback(lambda future: self.on_done(job))
+        return job
+        
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
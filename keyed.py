@@ -0,0 +1,136 @@
+"""HMAC and PBKDF2-HMAC on the SHA-2 engine.
+
+HMAC(K, m) = H((K ^ opad) || H((K ^ ipad) || m)), where the key is
+padded (or first hashed) to exactly one block. Both passes therefore
+start by compressing a block that depends only on the key. HMACKey
+compresses those two blocks once and every MAC under the key resumes
+from the saved midstates, so a MAC costs the message blocks plus one
+outer block instead of two more. PBKDF2 computes thousands of MACs of a
+single digest under the same password, which brings each iteration
+down to two compressions from four.
+"""
+import struct
+
+from cache import LRUCache
+
+IPAD = 0x36
+OPAD = 0x5c
+KEY_CACHE_ENTRIES = 64        # Keys whose pad midstates hmac_key() keeps
+PROGRESS_ITERATIONS = 1000    # PBKDF2 iterations between progress callbacks
+
+class HMACKey:
+    """A key with its ipad and opad blocks already compressed"""
+    def __init__(self, algorithm, key):
+        block_bytes = algorithm.block_size // 8
+        key = bytes(key)
+        if len(key) > block_bytes:
+            key = algorithm.new(key).digest()
+        key = key.ljust(block_bytes, b'\0')
+        self.algorithm = algorithm
+        self.block_bytes = block_bytes
+        self.digest_size = algorithm.digest_bits // 8
+        self.inner_block = bytes(byte ^ IPAD for byte in key)
+        self.outer_block = bytes(byte ^ OPAD for byte in key)
+        self.inner_state = tuple(algorithm.compress(self.inner_block, algorithm.init_values))
+        self.outer_state = tuple(algorithm.compress(self.outer_block, algorithm.init_values))
+        
+    def resume(self, hash_values):
+        """A Hasher that has consumed one padded key block, leaving hash_values"""
+        hasher = self.algorithm.new()
+        hasher.hash_values = list(hash_values)
+        hasher.length = self.block_bytes
+        return hasher
+        
+    def new(self, msg=b''):
+        return HMAC(self, msg)
+
+class HMAC:
+    """hmac-style keyed hasher; update() feeds the inner pass"""
+    def __init__(self, key, msg=b''):
+        self.key = key
+        self.inner = key.resume(key.inner_state)
+        self.name = f"hmac-{self.inner.name}"
+        self.digest_size = key.digest_size
+        self.block_size = key.block_bytes
+        if msg:
+            self.update(msg)
+            
+    def update(self, msg):
+        self.inner.update(msg)
+        
+    def inner_digest(self):
+        """H((K ^ ipad) || message), the message of the outer pass"""
+        return self.inner.digest()
+        
+    def digest(self):
+        outer = self.key.resume(self.key.outer_state)
+        outer.update(self.inner_digest())
+        return outer.digest()
+        
+    def hexdigest(self):
+        return self.digest().hex()
+        
+    def copy(self):
+        other = HMAC.__new__(HMAC)
+        other.__dict__.update(self.__dict__)
+        other.inner = self.inner.copy()
+        return other
+
+# Prepared keys by (algorithm, key). Keys stay in memory while cached;
+# call key_cache.clear() once they are no longer needed.
+key_cache = LRUCache(max_entries=KEY_CACHE_ENTRIES)
+
+def hmac_key(algorithm, key):
+    """The HMACKey of key, compressing its pads only the first time it is seen"""
+    cache_key = (algorithm.name, bytes(key))
+    prepared = key_cache.get(cache_key)
+    if prepared is None:
+        prepared = HMACKey(algorithm, key)
+        key_cache.put(cache_key, prepared)
+    return prepared
+
+def new_hmac(algorithm, key, msg=b''):
+    """Like hmac.new(key, msg, digestmod), with the pads taken from key_cache"""
+    return HMAC(hmac_key(algorithm, key), msg)
+
+def pbkdf2_hmac(algorithm, password, salt, iterations, dklen=None, progress=None):
+    """PBKDF2 (RFC 8018) over HMAC, like hashlib.pbkdf2_hmac().
+    
+    Every iteration after the first MACs the previous digest, which fits
+    in one block together with its padding in both passes. Those blocks
+    are built in place and compressed straight from the password's pad
+    midstates, without going through a Hasher. progress, if given, is
+    called with the iterations done so far (over all output blocks) every
+    PROGRESS_ITERATIONS; it may raise to abandon the derivation.
+    """
+    if iterations < 1:
+        raise ValueError("iterations must be at least 1")
+    key = HMACKey(algorithm, password)
+    digest_size = key.digest_size
+    if dklen is None:
+        dklen = digest_size
+    if dklen < 1:
+        raise ValueError("dklen must be at least 1")
+        
+    # H0-H7 back to bytes; the truncated variants keep the first digest_size
+    pack = struct.Struct(algorithm.word_format[0] + "8" + algorithm.word_format[-1]).pack
+    # A pad block plus one digest, in both passes
+    tail = algorithm.padding(key.block_bytes + digest_size)
+    compress = algorithm.compress
+    inner_state, outer_state = key.inner_state, key.outer_state
+    
+    derived = []
+    output_blocks = -(-dklen // digest_size)
+    for index in range(1, output_blocks + 1):
+        u = key.new(bytes(salt) + index.to_bytes(4, 'big')).digest()
+        result = int.from_bytes(u, 'big')
+        for iteration in range(1, iterations):
+            u = pack(*compress(u + tail, inner_state))[:digest_size]
+            u = pack(*compress(u + tail, outer_state))[:digest_size]
+            result ^= int.from_bytes(u, 'big')
+            if progress and iteration % PROGRESS_ITERATIONS == 0:
+                progress((index - 1) * iterations + iteration)
+        derived.append(result.to_bytes(digest_size, 'big'))
+    if progress:
+        progress(output_blocks * iterations)
+    return b''.join(derived)[:dklen]
@@ -0,0 +1,143 @@
+"""Named timing spans, exported as Chrome trace events.
+
+Nothing in the engine or the visualizer calls into this module. Instead
+Profiler.instrument() swaps the functions and methods to be timed for
+wrappers that record one span per call, and restore() puts the
+originals back, so with profiling off the code runs exactly as written.
+Spans are kept as Chrome trace-event "complete" events; open the file
+written by save_chrome_trace() in chrome://tracing or ui.perfetto.dev.
+"""
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+MAX_EVENTS = 500000  # Spans kept per profile; later ones are only counted
+
+# Engine stages timed by instrument_engine(), per algorithm instance
+ENGINE_METHODS = ("process_message", "prepare_message_schedule", "compress_block", "compress", "compression_trace")
+ENGINE_FUNCTIONS = ("hash_checkpointed", "hash_stream", "hash_file", "hash_file_resumable", "read_file")
+
+class Profiler:
+    """Records spans (name, category, start, end, thread) in nanoseconds"""
+    def __init__(self, max_events=MAX_EVENTS):
+        self.max_events = max_events
+        self.events = []
+        self.dropped = 0
+        self.thread_names = {}  # Job threads may be gone by the time the trace is saved
+        self.started = time.perf_counter_ns()
+        self.patched = []  # (target, attribute, original or None if inherited), in patch order
+        
+    def record(self, name, category, start, end):
+        if len(self.events) >= self.max_events:
+            self.dropped += 1
+            return
+        # list.append is atomic, so job threads can record too
+        tid = threading.get_ident()
+        if tid not in self.thread_names:
+            self.thread_names[tid] = threading.current_thread().name
+        self.events.append((name, category, start, end, tid))
+        
+    @contextmanager
+    def span(self, name, category="app"):
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.record(name, category, start, time.perf_counter_ns())
+            
+    def wrap(self, func, name, category):
+        """func, recording a span around every call"""
+        record = self.record
+        clock = time.perf_counter_ns
+        
+        @wraps(func)
+        def timed(*args, **kwargs):
+            start = clock()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(name, category, start, clock())
+                
+        return timed
+        
+    def instrument(self, target, names, category, prefix=""):
+        """Time target's attributes names: methods of a class or an instance, or functions of a module"""
+        for attribute in names:
+            own = vars(target).get(attribute)
+            current = getattr(target, attribute)
+            self.patched.append((target, attribute, own))
+            setattr(target, attribute, self.wrap(current, prefix + attribute, category))
+            
+    def instrument_function(self, module, name, category):
+        """Time a module function, also where other loaded modules imported it by name"""
+        original = getattr(module, name)
+        for loaded in list(sys.modules.values()):
+            namespace = getattr(loaded, "__dict__", None)
+            if isinstance(namespace, dict) and namespace.get(name) is original:
+                self.instrument(loaded, [name], category, prefix=f"{module.__name__}.")
+                
+    def restore(self):
+        """Put every instrumented attribute back"""
+        for target, attribute, original in reversed(self.patched):
+            if original is None:
+                delattr(target, attribute)
+            else:
+                setattr(target, attribute, original)
+        self.patched = []
+        
+    def summary(self):
+        """(name, calls, total seconds) per span name, longest total first; nested spans overlap"""
+        totals = {}
+        for name, _, start, end, _ in self.events:
+            entry = totals.setdefault(name, [0, 0])
+            entry[0] += 1
+            entry[1] += end - start
+        return sorted(((name, calls, ns / 1e9) for name, (calls, ns) in totals.items()),
+                      key=lambda row: row[2], reverse=True)
+                      
+    def chrome_trace(self):
+        """The spans as a Chrome trace-event JSON object"""
+        pid = os.getpid()
+        events = [{"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}}
+                  for tid, name in self.thread_names.items()]
+        for name, category, start, end, tid in self.events:
+            events.append({
+                "name": name,
+                "cat": category,
+                "ph": "X",
+                "ts": (start - self.started) / 1000,  # Microseconds since the profile started
+                "dur": (end - start) / 1000,
+                "pid": pid,
+                "tid": tid,
+            })
+        return {"traceEvents": events, "displayTimeUnit": "ms", "otherData": {"dropped_spans": self.dropped}}
+        
+    def save_chrome_trace(self, path):
+        import json
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.chrome_trace(), f)
+
+def instrument_engine(profiler):
+    """Time the hashing stages of every algorithm and the file and stream functions"""
+    import hashing
+    from unrolled import build_compress
+    for algorithm in hashing.ALGORITHMS.values():
+        # The unrolled compress() otherwise replaces itself on first use, dropping the wrapper
+        if "compress" not in vars(algorithm):
+            algorithm.compress = build_compress(algorithm)
+        profiler.instrument(algorithm, ENGINE_METHODS, "engine", prefix=f"{algorithm.name}.")
+    profiler.instrument(hashing.Hasher, ["update", "hexdigest"], "engine", prefix="Hasher.")
+    profiler.instrument(hashing.BlockWalk, ["chaining_values", "trace"], "engine", prefix="BlockWalk.")
+    profiler.instrument(hashing.BitView, ["__getitem__", "hex"], "format", prefix="BitView.")
+    for name in ENGINE_FUNCTIONS:
+        profiler.instrument_function(hashing, name, "engine")
+
+def print_summary(profiler, file=sys.stderr, limit=25):
+    print(f"{'span':<40} {'calls':>9} {'total ms':>11} {'mean us':>10}", file=file)
+    for name, calls, seconds in profiler.summary()[:limit]:
+        print(f"{name:<40} {calls:9d} {seconds * 1000:11.2f} {seconds / calls * 1e6:10.2f}", file=file)
+    if profiler.dropped:
+        print(f"{profiler.dropped:,} spans past the first {profiler.max_events:,} were not kept", file=file)
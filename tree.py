@@ -0,0 +1,121 @@
+"""Parallel Merkle tree hashing of large files on the SHA-2 cores.
+
+Plain SHA-2 chains every block through the previous one, so a single
+file never uses more than one core. In tree mode the file is split into
+fixed-size leaves that are hashed independently, across worker
+processes, and the leaf digests are combined pairwise into a Merkle tree:
+
+    leaf = H(0x00 || leaf bytes)
+    node = H(0x01 || left digest || right digest)
+
+The prefixes keep a leaf from ever being read as an inner node. A node
+without a partner moves up to the next level unchanged, and an empty
+file is a single empty leaf. Tree digests are written as
+"<algo>-tree-<leaf size>:<hex root>", so they cannot be mistaken for the
+plain digest of the same file.
+"""
+import mmap
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from hashing import ALGORITHMS, read_file
+
+DEFAULT_LEAF_SIZE = 1 << 20
+LEAVES_PER_TASK = 4  # Leaves a worker hashes per task
+LEAF_PREFIX = b"\x00"
+NODE_PREFIX = b"\x01"
+
+def leaf_digest(algorithm, data):
+    hasher = algorithm.new(LEAF_PREFIX)
+    hasher.update(data)
+    return hasher.digest()
+
+def node_digest(algorithm, left, right):
+    return algorithm.new(NODE_PREFIX + left + right).digest()
+
+def merkle_levels(algorithm, leaves):
+    """Every level of the tree over leaf digests, from the leaves up to [root]"""
+    levels = [list(leaves)]
+    while len(levels[-1]) > 1:
+        level = levels[-1]
+        parents = [node_digest(algorithm, level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+        if len(level) % 2:
+            parents.append(level[-1])
+        levels.append(parents)
+    return levels
+
+def leaf_count(size, leaf_size):
+    return max(1, -(-size // leaf_size))
+
+def format_tree_digest(algorithm, leaf_size, root):
+    """The tree output format, e.g. sha256-tree-1M:<hex root>"""
+    for suffix, unit in (("M", 1 << 20), ("K", 1 << 10)):
+        if leaf_size % unit == 0:
+            label = f"{leaf_size // unit}{suffix}"
+            break
+    else:
+        label = str(leaf_size)
+    return f"{algorithm.new().name}-tree-{label}:{root.hex()}"
+
+def tree_hash_bytes(algorithm, data, leaf_size=DEFAULT_LEAF_SIZE, progress=None):
+    """Tree levels of an in-memory message, hashed in this process.
+    
+    progress, if given, is called with the bytes hashed so far after
+    every leaf; it may raise to abandon the hash.
+    """
+    if leaf_size < 1:
+        raise ValueError("leaf size must be at least 1 byte")
+    data = memoryview(data).cast('B')
+    leaves = []
+    for index in range(leaf_count(len(data), leaf_size)):
+        leaves.append(leaf_digest(algorithm, data[index * leaf_size:(index + 1) * leaf_size]))
+        if progress:
+            progress(min(len(data), (index + 1) * leaf_size))
+    return merkle_levels(algorithm, leaves)
+
+def _hash_leaf_range(algo, path, leaf_size, first, count):
+    """Worker entry point: digests of count leaves of a file starting at leaf first"""
+    algorithm = ALGORITHMS[algo]
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        view = memoryview(mapped)
+        try:
+            return [leaf_digest(algorithm, view[i * leaf_size:(i + 1) * leaf_size])
+                    for i in range(first, first + count)]
+        finally:
+            view.release()
+
+def tree_hash_file(algorithm, path, leaf_size=DEFAULT_LEAF_SIZE, workers=None, progress=None):
+    """Tree levels of a file, with its leaves hashed across worker processes.
+    
+    workers defaults to one per CPU; with one worker (or one leaf) the
+    leaves are hashed in this process. progress is called as in
+    tree_hash_bytes(), after every task when several workers are used.
+    """
+    if leaf_size < 1:
+        raise ValueError("leaf size must be at least 1 byte")
+    if workers is None:
+        workers = os.cpu_count() or 1
+    size = os.path.getsize(path)
+    count = leaf_count(size, leaf_size)
+    if workers <= 1 or count == 1:
+        return tree_hash_bytes(algorithm, read_file(path), leaf_size, progress)
+        
+    algo = algorithm.new().name
+    leaves = [None] * count
+    done = 0
+    executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        tasks = {executor.submit(_hash_leaf_range, algo, path, leaf_size, first,
+                                 min(LEAVES_PER_TASK, count - first)): first
+                 for first in range(0, count, LEAVES_PER_TASK)}
+        for task in as_completed(tasks):
+            first = tasks[task]
+            digests = task.result()
+            leaves[first:first + len(digests)] = digests
+            done += len(digests)
+            if progress:
+                progress(min(size, done * leaf_size))
+    finally:
+        # Drop the queued tasks if a task failed or progress raised
+        executor.shutdown(cancel_futures=True)
+    return merkle_levels(algorithm, leaves)
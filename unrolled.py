@@ -0,0 +1,66 @@
+"""Unrolled SHA-2 compression functions generated from an algorithm's constants.
+
+The readable compress_block() loops over the rounds, calls rotr() six
+times per round and looks up k_values and the schedule by index. The
+generated function instead spells out every round with the rotations,
+round constants and word masks written in as literals, computes each
+schedule word right before the round that uses it, and renames the
+working variables between rounds rather than shifting them. It is only
+used where the intermediate values are not needed; the visualizer keeps
+tracing the readable version.
+"""
+import struct
+
+# Compiled functions by source; the truncated variants share their parent's
+_compiled = {}
+
+def _rotr(x, n, bits):
+    # Bits above the word size are left in and masked off by the caller
+    return f"({x} >> {n} | {x} << {bits - n})"
+
+def compression_source(algorithm):
+    """Python source of compress(block, hash_values) -> new hash values for algorithm"""
+    bits = algorithm.word_size
+    mask = f"{(1 << bits) - 1:#x}"
+    sum0 = algorithm.sum0_rotations
+    sum1 = algorithm.sum1_rotations
+    (r0a, r0b, shift0), (r1a, r1b, shift1) = algorithm.sigma0_shifts, algorithm.sigma1_shifts
+    
+    lines = [
+        "def compress(block, hash_values, unpack=unpack):",
+        "    " + ", ".join(f"w{i}" for i in range(16)) + " = unpack(block)",
+        "    a, b, c, d, e, f, g, h = hash_values",
+    ]
+    names = list("abcdefgh")
+    for i in range(algorithm.rounds):
+        if i >= 16:
+            x, y = f"w{i-15}", f"w{i-2}"
+            s0 = f"({_rotr(x, r0a, bits)} ^ {_rotr(x, r0b, bits)} ^ {x} >> {shift0})"
+            s1 = f"({_rotr(y, r1a, bits)} ^ {_rotr(y, r1b, bits)} ^ {y} >> {shift1})"
+            # Carries only move upwards, so one final mask covers the whole sum
+            lines.append(f"    w{i} = (w{i-16} + {s0} + w{i-7} + {s1}) & {mask}")
+            
+        a, b, c, d, e, f, g, h = names
+        S1 = " ^ ".join(_rotr(e, n, bits) for n in sum1)
+        S0 = " ^ ".join(_rotr(a, n, bits) for n in sum0)
+        lines += [
+            f"    t = {h} + (({S1}) & {mask}) + ({g} ^ ({e} & ({f} ^ {g}))) + {algorithm.k_values[i]:#x} + w{i}",
+            f"    {d} = ({d} + t) & {mask}",
+            f"    {h} = (t + (({S0}) & {mask}) + (({a} & {b}) | ({c} & ({a} | {b})))) & {mask}",
+        ]
+        # h now holds the new a and d the new e; rename instead of moving values
+        names = [h] + names[:7]
+        
+    lines.append("    return [" + ", ".join(
+        f"(hash_values[{i}] + {name}) & {mask}" for i, name in enumerate(names)) + "]")
+    return "\n".join(lines) + "\n"
+
+def build_compress(algorithm):
+    """Compile the unrolled compression function of algorithm"""
+    source = compression_source(algorithm)
+    compress = _compiled.get(source)
+    if compress is None:
+        namespace = {"unpack": struct.Struct(algorithm.word_format).unpack}
+        exec(compile(source, f"<unrolled {algorithm.name}>", "exec"), namespace)
+        compress = _compiled[source] = namespace["compress"]
+    return compress
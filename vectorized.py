@@ -0,0 +1,120 @@
+"""NumPy-vectorized SHA-2 for many independent messages.
+
+The working variables a-h of N messages are held as uint32 (SHA-256) or
+uint64 (SHA-512) arrays, so every round and every message schedule step
+runs across all lanes at once. Messages are grouped by their padded
+block count so each group can be compressed in lockstep.
+
+NumPy is optional; the rest of the project works without it.
+"""
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from hashing import ALGORITHMS, HashAlgorithm
+
+DEFAULT_LANES = 4096  # Messages compressed together per group
+
+def _require_numpy():
+    if np is None:
+        raise RuntimeError("the vectorized engine requires numpy (pip install numpy)")
+
+def _dtype(algorithm):
+    return np.dtype(np.uint32 if algorithm.word_size == 32 else np.uint64)
+
+def prepare_message_schedules(algorithm, words):
+    """Expand (16, N) block words into a (rounds, N) message schedule array"""
+    _require_numpy()
+    dtype = words.dtype.type
+    bits = algorithm.word_size
+    r0a, r0b, shift0 = (dtype(n) for n in algorithm.sigma0_shifts)
+    r1a, r1b, shift1 = (dtype(n) for n in algorithm.sigma1_shifts)
+    r0a_l, r0b_l = dtype(bits - r0a), dtype(bits - r0b)
+    r1a_l, r1b_l = dtype(bits - r1a), dtype(bits - r1b)
+    
+    w = np.empty((algorithm.rounds, words.shape[1]), dtype=words.dtype)
+    w[:16] = words
+    for i in range(16, algorithm.rounds):
+        x = w[i-15]
+        y = w[i-2]
+        s0 = ((x >> r0a) | (x << r0a_l)) ^ ((x >> r0b) | (x << r0b_l)) ^ (x >> shift0)
+        s1 = ((y >> r1a) | (y << r1a_l)) ^ ((y >> r1b) | (y << r1b_l)) ^ (y >> shift1)
+        w[i] = w[i-16] + s0 + w[i-7] + s1
+    return w
+
+def compress_blocks(algorithm, words, state):
+    """Compress one block per lane.
+    
+    words is a (16, N) array of block words and state an (8, N) array of
+    chaining values; returns the new (8, N) state.
+    """
+    _require_numpy()
+    dtype = words.dtype.type
+    bits = algorithm.word_size
+    k_values = np.array(algorithm.k_values, dtype=words.dtype)
+    w = prepare_message_schedules(algorithm, words)
+    
+    rot0 = [(dtype(n), dtype(bits - n)) for n in algorithm.sum0_rotations]
+    rot1 = [(dtype(n), dtype(bits - n)) for n in algorithm.sum1_rotations]
+    (r0a, l0a), (r0b, l0b), (r0c, l0c) = rot0
+    (r1a, l1a), (r1b, l1b), (r1c, l1c) = rot1
+    
+    a, b, c, d, e, f, g, h = state
+    for i in range(algorithm.rounds):
+        S1 = ((e >> r1a) | (e << l1a)) ^ ((e >> r1b) | (e << l1b)) ^ ((e >> r1c) | (e << l1c))
+        ch = (e & f) ^ (~e & g)
+        temp1 = h + S1 + ch + k_values[i] + w[i]
+        S0 = ((a >> r0a) | (a << l0a)) ^ ((a >> r0b) | (a << l0b)) ^ ((a >> r0c) | (a << l0c))
+        maj = (a & b) ^ (a & c) ^ (b & c)
+        temp2 = S0 + maj
+        
+        h = g
+        g = f
+        f = e
+        e = d + temp1
+        d = c
+        c = b
+        b = a
+        a = temp1 + temp2
+        
+    return state + np.stack([a, b, c, d, e, f, g, h])
+
+def _hash_group(algorithm, padded_messages):
+    dtype = _dtype(algorithm)
+    block_bytes = algorithm.block_size // 8
+    lanes = len(padded_messages)
+    block_count = len(padded_messages[0]) // block_bytes
+    
+    # (lanes, blocks, 16) big-endian words, transposed so lanes are the last axis
+    raw = np.frombuffer(b''.join(padded_messages), dtype=dtype.newbyteorder('>'))
+    words = raw.reshape(lanes, block_count, 16).astype(dtype).transpose(1, 2, 0)
+    
+    state = np.repeat(np.array(algorithm.init_values, dtype=dtype)[:, None], lanes, axis=1)
+    for block_index in range(block_count):
+        state = compress_blocks(algorithm, np.ascontiguousarray(words[block_index]), state)
+        
+    return [algorithm.format_hash([int(v) for v in state[:, lane]]) for lane in range(lanes)]
+
+def hash_messages(messages, algorithm="sha256", lanes=DEFAULT_LANES):
+    """Hash a list of messages (bytes, or str encoded as UTF-8) and return hex digests in order"""
+    _require_numpy()
+    if not isinstance(algorithm, HashAlgorithm):
+        algorithm = ALGORITHMS[algorithm]
+        
+    # Group message indices by padded length so each group runs in lockstep
+    groups = {}
+    padded = []
+    for index, message in enumerate(messages):
+        if isinstance(message, str):
+            message = message.encode("utf-8")
+        padded.append(algorithm.pad_message(message))
+        groups.setdefault(len(padded[-1]), []).append(index)
+        
+    digests = [None] * len(padded)
+    for indices in groups.values():
+        for start in range(0, len(indices), lanes):
+            chunk = indices[start:start+lanes]
+            for index, digest in zip(chunk, _hash_group(algorithm, [padded[i] for i in chunk])):
+                digests[index] = digest
+    return digests
@@ -0,0 +1,394 @@
+"""Conformance checks of every hashing path against known answers and hashlib.
+
+Each case is hashed through every path in VERIFY_PATHS (and, for the
+paths that take many messages at once, BATCH_PATHS) and compared with
+the expected digest: a published known answer, or hashlib for the
+randomized cases. TREE_PATHS are compared with a Merkle root built from
+hashlib, and KEYED_PATHS with the standard library's hmac and
+hashlib.pbkdf2_hmac. Cases are spread over worker processes like a batch.
+"""
+import hashlib
+import hmac
+import os
+import random
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from hashing import ALGORITHMS, BlockWalk, PrefixCache, hash_file
+
+DEFAULT_CASES = 200      # Randomized cases per algorithm
+DEFAULT_MAX_BLOCKS = 4   # Largest randomized message, in blocks
+CASES_PER_CHUNK = 16
+
+# Known answers from FIPS 180-2 appendices B and C and the FIPS 180-4 examples
+# (SHAVS uses the same format)
+SHORT_VECTORS = {
+    "sha224": [
+        (b"abc", "23097d223405d8228642a477bda255b32aadbce4bda0b3f7e36c9da7"),
+    ],
+    "sha256": [
+        (b"", "e3b0c44298fc1c149afbf4c8996fb92427ae41e4649b934ca495991b7852b855"),
+        (b"abc", "ba7816bf8f01cfea414140de5dae2223b00361a396177a9cb410ff61f20015ad"),
+        (b"abcdbcdecdefdefgefghfghighijhijkijkljklmklmnlmnomnopnopq",
+         "248d6a61d20638b8e5c026930c3e6039a33ce45964ff2167f6ecedd419db06c1"),
+    ],
+    "sha512": [
+        (b"", "cf83e1357eefb8bdf1542850d66d8007d620e4050b5715dc83f4a921d36ce9ce"
+              "47d0d13c5d85f2b0ff8318d2877eec2f63b931bd47417a81a538327af927da3e"),
+        (b"abc", "ddaf35a193617abacc417349ae20413112e6fa4e89a97ea20a9eeee64b55d39a"
+                 "2192992a274fc1a836ba3c23a3feebbd454d4423643ce80e2a9ac94fa54ca49f"),
+        (b"abcdefghbcdefghicdefghijdefghijkefghijklfghijklmghijklmnhijklmno"
+         b"ijklmnopjklmnopqklmnopqrlmnopqrsmnopqrstnopqrstu",
+         "8e959b75dae313da8cf4f72814fc143f8f7779c6eb9f7fa17299aeadb6889018"
+         "501d289e4900f7e4331b99dec4b5433ac7d329eeb6dd26545e96e55b874be909"),
+    ],
+    "sha384": [
+        (b"abc", "cb00753f45a35e8bb5a03d699ac65007272c32ab0eded163"
+                 "1a8b605a43ff5bed8086072ba1e7cc2358baeca134c825a7"),
+    ],
+    "sha512_224": [
+        (b"abc", "4634270f707b6a54daae7530460842e20e37ed265ceee9a43e8924aa"),
+    ],
+    "sha512_256": [
+        (b"abc", "53048e2681941ef99b2e29b76b4c7dabe4c2d0c634fc6d46e0e2f13107e7af23"),
+    ],
+}
+
+# One million repetitions of 'a'; slow in pure Python, so only run with long=True
+LONG_VECTORS = {
+    "sha224": [((b"a", 1000000), "20794655980c91d8bbb4c1ea97618a4bf03f42581948b2ee4ee7ad67")],
+    "sha256": [((b"a", 1000000), "cdc76e5c9914fb9281a1c7e284d73e67f1809a48a497200e046d39ccc7112cd0")],
+    "sha512": [((b"a", 1000000), "e718483d0ce769644e2e42c7bc15b4638e1f98b13b2044285632a803afa973eb"
+                                 "de0ff244877ea60a4cb0432ce577c31beb009c5c2c49aa2e4eadb217ad8cc09b")],
+    "sha384": [((b"a", 1000000), "9d0e1809716474cb086e834e310a4a1ced149e9c00f24852"
+                                 "7972cec5704c2a5b07b8b3dc38ecc4ebae97ddd87f3d8985")],
+}
+
+# Text outside Latin-1, hashed as UTF-8 by every path that accepts str
+TEXT_SAMPLES = ["héllo wörld", "Привет, мир", "你好，世界", "🔐🧮 sha", "a\u0000b\r\n\t", "ß" * 100]
+
+# SHAVS response files name the digest length in bytes in their [L = n] header
+SHAVS_DIGEST_LENGTHS = {28: "sha224", 32: "sha256", 48: "sha384", 64: "sha512"}
+
+# SHA-512/224 and SHA-512/256 share their lengths with SHA-224 and SHA-256,
+# so those files are told apart by name (SHA512_224ShortMsg.rsp)
+SHAVS_FILE_PREFIXES = {"SHA512_224": "sha512_224", "SHA512_256": "sha512_256"}
+
+def load_shavs(path):
+    """Parse a SHAVS .rsp file into (algo, message bytes, expected hex digest) tuples"""
+    name = os.path.basename(path).upper()
+    named = next((algo for prefix, algo in SHAVS_FILE_PREFIXES.items() if name.startswith(prefix)), None)
+    algo = None
+    length = None
+    message = None
+    vectors = []
+    with open(path, encoding="ascii") as f:
+        for line in f:
+            line = line.strip()
+            if line.startswith("[L") and "=" in line:
+                algo = named or SHAVS_DIGEST_LENGTHS.get(int(line.strip("[]").split("=")[1]))
+            elif line.startswith("Len ="):
+                length = int(line.split("=")[1])
+            elif line.startswith("Msg ="):
+                message = bytes.fromhex(line.split("=")[1].strip())
+            elif line.startswith("MD =") and algo is not None:
+                # Len = 0 still carries a one-byte "00" message
+                vectors.append((algo, message[:length // 8], line.split("=")[1].strip()))
+    return vectors
+
+# Paths under test
+def _chunked_updates(algorithm, data, seed):
+    """Feed data in random pieces, checking a copy() taken half way as well"""
+    rng = random.Random(seed)
+    hasher = algorithm.new()
+    view = memoryview(data)
+    offset = 0
+    snapshot = None
+    while offset < len(view):
+        step = rng.randint(1, 2 * (algorithm.block_size // 8))
+        hasher.update(view[offset:offset+step])
+        offset += step
+        if snapshot is None and offset >= len(view) // 2:
+            snapshot = (hasher.copy(), view[offset:])
+    if snapshot is not None:
+        copied, rest = snapshot
+        copied.update(rest)
+        if copied.hexdigest() != hasher.hexdigest():
+            return "copy() diverged: " + copied.hexdigest()
+    return hasher.hexdigest()
+
+def _walk_traces(algorithm, data):
+    """Chain the visualizer's per-block traces the way the GUI walks them"""
+    blocks = algorithm.process_message(data)[3]
+    walk = BlockWalk(algorithm, blocks)
+    return algorithm.format_hash(walk.trace(len(blocks) - 1).hash_values)
+
+def _readable_blocks(algorithm, data):
+    """Chain the readable compress_block that the unrolled function replaces"""
+    hash_values = list(algorithm.init_values)
+    for block in algorithm.process_message(data)[3]:
+        hash_values, _, _ = algorithm.compress_block(block, hash_values)
+    return algorithm.format_hash(hash_values)
+
+def _prefix_cached(algorithm, data):
+    """Hash a longer message first so data resumes from its cached full blocks"""
+    cache = PrefixCache()
+    cache.hexdigest(algorithm, bytes(data) + b"tail")
+    return cache.hexdigest(algorithm, data)
+
+def _hash_temp_file(algorithm, data):
+    # Empty files cannot be mapped, so this covers the streamed fallback as well
+    fd, path = tempfile.mkstemp(prefix="sha-verify-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        return hash_file(algorithm, path)
+    finally:
+        os.unlink(path)
+
+def _vectorized(algorithm, messages):
+    from vectorized import hash_messages
+    return hash_messages(messages, algorithm)
+
+# name -> function(algorithm, data, seed) returning a hex digest
+VERIFY_PATHS = {
+    "process_message": lambda algorithm, data, seed: algorithm.process_message(data)[0],
+    "hasher": lambda algorithm, data, seed: algorithm.new(data).hexdigest(),
+    "hasher_chunked": lambda algorithm, data, seed: _chunked_updates(algorithm, data, seed),
+    "compress_block": lambda algorithm, data, seed: _readable_blocks(algorithm, data),
+    "trace": lambda algorithm, data, seed: _walk_traces(algorithm, data),
+    "file": lambda algorithm, data, seed: _hash_temp_file(algorithm, data),
+    "prefix_cache": lambda algorithm, data, seed: _prefix_cached(algorithm, data),
+}
+
+# name -> function(algorithm, list of data) returning hex digests in order
+BATCH_PATHS = {
+    "vectorized": _vectorized,
+}
+
+# Tree mode has no hashlib equivalent, so its roots are checked against a
+# small reference built from hashlib, with leaves a few blocks long
+TREE_LEAF_SIZE = 200
+
+def _reference_tree_root(algo, data, leaf_size=TREE_LEAF_SIZE):
+    def digest(data):
+        return hashlib.new(algo, data).digest()
+    level = [digest(b"\x00" + data[i:i+leaf_size]) for i in range(0, len(data), leaf_size)] or [digest(b"\x00")]
+    while len(level) > 1:
+        parents = [digest(b"\x01" + level[i] + level[i+1]) for i in range(0, len(level) - 1, 2)]
+        level = parents + level[len(parents) * 2:]
+    return level[0].hex()
+
+def _tree_bytes(algorithm, data):
+    from tree import tree_hash_bytes
+    return tree_hash_bytes(algorithm, data, TREE_LEAF_SIZE)[-1][0].hex()
+
+def _tree_file(algorithm, data):
+    from tree import tree_hash_file
+    fd, path = tempfile.mkstemp(prefix="sha-verify-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        # Cases already run in worker processes; no nested pools
+        return tree_hash_file(algorithm, path, TREE_LEAF_SIZE, workers=1)[-1][0].hex()
+    finally:
+        os.unlink(path)
+
+# name -> function(algorithm, data) returning the hex tree root
+TREE_PATHS = {
+    "tree_hash": _tree_bytes,
+    "tree_hash_file": _tree_file,
+}
+
+# HMAC keys: empty, short, exactly one SHA-256 block, and longer than any block
+HMAC_KEYS = (b"", b"key", bytes(range(64)), bytes(range(200)))
+PBKDF2_ITERATIONS = 3
+
+def _pbkdf2_length(algo):
+    # Two full output blocks and part of a third
+    return 2 * hashlib.new(algo).digest_size + 5
+
+def _keyed_hmac(algorithm, data):
+    from keyed import new_hmac
+    return " ".join(new_hmac(algorithm, key, data).hexdigest() for key in HMAC_KEYS)
+
+def _reference_hmac(algo, data):
+    return " ".join(hmac.new(key, data, algo).hexdigest() for key in HMAC_KEYS)
+
+def _keyed_pbkdf2(algorithm, data):
+    from keyed import pbkdf2_hmac
+    algo = algorithm.new().name
+    return pbkdf2_hmac(algorithm, data, b"salt", PBKDF2_ITERATIONS, _pbkdf2_length(algo)).hex()
+
+def _reference_pbkdf2(algo, data):
+    return hashlib.pbkdf2_hmac(algo, data, b"salt", PBKDF2_ITERATIONS, _pbkdf2_length(algo)).hex()
+
+# name -> (function(algorithm, data), reference function(algo, data)), both returning hex
+KEYED_PATHS = {
+    "hmac": (_keyed_hmac, _reference_hmac),
+    "pbkdf2_hmac": (_keyed_pbkdf2, _reference_pbkdf2),
+}
+
+def _batch_path_available(name):
+    if name == "vectorized":
+        try:
+            import numpy  # noqa: F401
+        except ImportError:
+            return False
+    return True
+
+# Cases
+def boundary_sizes(algorithm, max_blocks=DEFAULT_MAX_BLOCKS):
+    """Message sizes around the block and padding boundaries"""
+    block_bytes = algorithm.block_size // 8
+    # Longest message whose padding still fits in the same block
+    single = block_bytes - 1 - algorithm.length_size // 8
+    sizes = {0, 1}
+    for blocks in range(max_blocks):
+        base = blocks * block_bytes
+        for edge in (single, block_bytes):
+            sizes.update(base + edge + delta for delta in (-1, 0, 1))
+    return sorted(size for size in sizes if size >= 0)
+
+def build_cases(algo, count=DEFAULT_CASES, max_blocks=DEFAULT_MAX_BLOCKS, seed=0, long=False, shavs=()):
+    """Cases for one algorithm as (kind, payload, expected) tuples.
+    
+    Random messages are described by (seed, size) and generated in the
+    worker, so only small tuples cross process boundaries.
+    """
+    algorithm = ALGORITHMS[algo]
+    cases = [("vector", message, digest) for message, digest in SHORT_VECTORS.get(algo, ())]
+    if long:
+        cases += [("repeat", payload, digest) for payload, digest in LONG_VECTORS.get(algo, ())]
+    cases += [("vector", message, digest) for vector_algo, message, digest in shavs if vector_algo == algo]
+    cases += [("text", text, None) for text in TEXT_SAMPLES]
+    
+    rng = random.Random(seed)
+    cases += [("random", (rng.getrandbits(64), size), None) for size in boundary_sizes(algorithm, max_blocks)]
+    max_size = max_blocks * algorithm.block_size // 8
+    cases += [("random", (rng.getrandbits(64), rng.randint(0, max_size)), None) for _ in range(count)]
+    return cases
+
+def _case_data(kind, payload):
+    if kind == "random":
+        case_seed, size = payload
+        return random.Random(case_seed).randbytes(size), case_seed
+    if kind == "repeat":
+        unit, count = payload
+        return unit * count, 0
+    if kind == "text":
+        return payload.encode("utf-8"), 0
+    return payload, 0
+
+def _describe(kind, payload, data):
+    if kind == "random":
+        return f"random seed={payload[0]} size={len(data)}"
+    if kind == "text":
+        return f"text {payload!r}"
+    return f"{kind} size={len(data)}"
+
+def _check_chunk(algo, cases):
+    """Worker entry point: run every path over a chunk of cases"""
+    algorithm = ALGORITHMS[algo]
+    stats = {}
+    failures = []
+    
+    def record(path, description, got, expected, seconds, size):
+        entry = stats.setdefault(path, [0, 0, 0.0])
+        entry[0] += 1
+        entry[1] += size
+        entry[2] += seconds
+        if got != expected:
+            failures.append((algo, path, description, got, expected))
+            
+    batch = []
+    for kind, payload, expected in cases:
+        data, seed = _case_data(kind, payload)
+        if expected is None:
+            expected = hashlib.new(algo, data).hexdigest()
+        description = _describe(kind, payload, data)
+        batch.append((data, expected, description))
+        
+        for path, run in VERIFY_PATHS.items():
+            start = time.perf_counter()
+            try:
+                got = run(algorithm, data, seed)
+            except Exception as e:
+                got = f"{type(e).__name__}: {e}"
+            record(path, description, got, expected, time.perf_counter() - start, len(data))
+            
+        tree_root = _reference_tree_root(algo, data)
+        for path, run in TREE_PATHS.items():
+            start = time.perf_counter()
+            try:
+                got = run(algorithm, data)
+            except Exception as e:
+                got = f"{type(e).__name__}: {e}"
+            record(path, description, got, tree_root, time.perf_counter() - start, len(data))
+            
+        for path, (run, reference) in KEYED_PATHS.items():
+            start = time.perf_counter()
+            try:
+                got = run(algorithm, data)
+            except Exception as e:
+                got = f"{type(e).__name__}: {e}"
+            record(path, description, got, reference(algo, data), time.perf_counter() - start, len(data))
+            
+        # str input is encoded as UTF-8 by the engine itself
+        if kind == "text":
+            start = time.perf_counter()
+            try:
+                got = algorithm.process_message(payload)[0]
+            except Exception as e:
+                got = f"{type(e).__name__}: {e}"
+            record("process_message_str", description, got, expected, time.perf_counter() - start, len(data))
+            
+    for path, run in BATCH_PATHS.items():
+        if not _batch_path_available(path):
+            continue
+        start = time.perf_counter()
+        try:
+            digests = list(run(algorithm, [data for data, _, _ in batch]))
+            if len(digests) != len(batch):
+                raise ValueError(f"{len(digests)} digests for {len(batch)} messages")
+        except Exception as e:
+            # One failure of the whole batch counts against every case in it
+            digests = [f"{type(e).__name__}: {e}"] * len(batch)
+        per_case = (time.perf_counter() - start) / len(batch)
+        for (data, expected, description), got in zip(batch, digests):
+            record(path, description, got, expected, per_case, len(data))
+    return stats, failures
+
+def run_verification(algos, count=DEFAULT_CASES, max_blocks=DEFAULT_MAX_BLOCKS, seed=0,
+                     long=False, shavs=(), workers=None):
+    """Check every path; returns (per-path stats, failures, elapsed seconds).
+    
+    Stats map (algo, path) to [cases, bytes, seconds]; failures are
+    (algo, path, case, got, expected) tuples.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    jobs = []
+    for algo in algos:
+        cases = build_cases(algo, count, max_blocks, seed, long, shavs)
+        jobs += [(algo, cases[i:i+CASES_PER_CHUNK]) for i in range(0, len(cases), CASES_PER_CHUNK)]
+        
+    start = time.perf_counter()
+    if workers <= 1:
+        results = [_check_chunk(algo, chunk) for algo, chunk in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_check_chunk, *zip(*jobs)))
+    elapsed = time.perf_counter() - start
+    
+    stats = {}
+    failures = []
+    for (algo, _), (chunk_stats, chunk_failures) in zip(jobs, results):
+        for path, (cases, size, seconds) in chunk_stats.items():
+            entry = stats.setdefault((algo, path), [0, 0, 0.0])
+            entry[0] += cases
+            entry[1] += size
+            entry[2] += seconds
+        failures += chunk_failures
+    return stats, failures, elapsed